@@ -7,11 +7,11 @@ COLLATE utf8mb4_unicode_ci;
 
 USE banco_db;
 
--- Remove table if exists (for clean recreation)
-DROP TABLE IF EXISTS accounts;
+-- Safe to run again: existing tables and data are kept. Later schema
+-- changes are applied in place by pktCuentas/migrations.py.
 
 -- Create accounts table
-CREATE TABLE accounts (
+CREATE TABLE IF NOT EXISTS accounts (
     id INT AUTO_INCREMENT PRIMARY KEY,
     account_no INT NOT NULL UNIQUE,
     last_name VARCHAR(100) NOT NULL,
@@ -24,16 +24,34 @@ CREATE TABLE accounts (
     credit_limit DECIMAL(15,2) NOT NULL DEFAULT 0.00,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    location_norm VARCHAR(200) GENERATED ALWAYS AS (LOWER(TRIM(location))) VIRTUAL,
 
-    -- Indexes
-    INDEX idx_account_no (account_no),
-    INDEX idx_account_type (account_type),
-    INDEX idx_date (date),
+    -- Indexes (account_no is covered by its UNIQUE key)
+    INDEX idx_type_balance (account_type, balance),
+    INDEX idx_balance (balance),
+    INDEX idx_date_account (date, account_no),
+    INDEX idx_updated_at (updated_at),
+    INDEX idx_location_norm (location_norm),
     INDEX idx_last_name (last_name)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Create append-only transactions ledger
+CREATE TABLE IF NOT EXISTS transactions (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    account_no INT NOT NULL,
+    tx_type ENUM('deposit', 'withdrawal') NOT NULL,
+    amount DECIMAL(15,2) NOT NULL,
+    balance_after DECIMAL(15,2),
+    credit_after DECIMAL(15,2),
+    created_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+
+    -- Indexes (InnoDB appends the primary key, so statements read in order)
+    INDEX idx_tx_account_created (account_no, created_at),
+    INDEX idx_tx_created (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Insert sample data (optional)
-INSERT INTO accounts (account_no, last_name, middle_name, first_name, balance, date, location, account_type, credit_limit) VALUES
+INSERT IGNORE INTO accounts (account_no, last_name, middle_name, first_name, balance, date, location, account_type, credit_limit) VALUES
 (1010, 'Garcia', 'Lopez', 'Juan', 5000.00, '2025-01-15', 'Mexico City', 'normal', 0.00),
 (1011, 'Martinez', 'Perez', 'Maria', 3000.00, '2025-02-20', 'Guadalajara', 'credit', 2000.00),
 (1012, 'Hernandez', 'Sanchez', 'Luis', 8000.00, '2025-03-10', 'Monterrey', 'normal', 0.00),
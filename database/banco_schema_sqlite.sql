@@ -0,0 +1,50 @@
+-- Bank Database Schema (SQLite)
+-- Same tables and indexes as banco_schema.sql. DatabaseManager runs this
+-- script automatically the first time it opens an empty database file.
+
+-- Create accounts table
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_no INTEGER NOT NULL UNIQUE,
+    last_name VARCHAR(100) NOT NULL,
+    middle_name VARCHAR(100) NOT NULL,
+    first_name VARCHAR(100) NOT NULL,
+    balance REAL NOT NULL DEFAULT 0.00,
+    date DATE,
+    location VARCHAR(200),
+    account_type TEXT NOT NULL DEFAULT 'normal' CHECK (account_type IN ('normal', 'credit')),
+    credit_limit REAL NOT NULL DEFAULT 0.00,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Indexes (account_no is covered by its UNIQUE key)
+CREATE INDEX IF NOT EXISTS idx_type_balance ON accounts (account_type, balance);
+CREATE INDEX IF NOT EXISTS idx_balance ON accounts (balance);
+CREATE INDEX IF NOT EXISTS idx_date_account ON accounts (date, account_no);
+CREATE INDEX IF NOT EXISTS idx_updated_at ON accounts (updated_at);
+CREATE INDEX IF NOT EXISTS idx_location_norm ON accounts (LOWER(TRIM(location)));
+CREATE INDEX IF NOT EXISTS idx_last_name ON accounts (last_name);
+
+-- Equivalent of MySQL's ON UPDATE CURRENT_TIMESTAMP
+CREATE TRIGGER IF NOT EXISTS trg_accounts_updated_at
+AFTER UPDATE ON accounts
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE accounts SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+-- Create append-only transactions ledger
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_no INTEGER NOT NULL,
+    tx_type TEXT NOT NULL CHECK (tx_type IN ('deposit', 'withdrawal')),
+    amount REAL NOT NULL,
+    balance_after REAL,
+    credit_after REAL,
+    created_at TIMESTAMP NOT NULL DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+-- Indexes
+CREATE INDEX IF NOT EXISTS idx_tx_account_created ON transactions (account_no, created_at);
+CREATE INDEX IF NOT EXISTS idx_tx_created ON transactions (created_at);
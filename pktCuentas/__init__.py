@@ -1,5 +1,6 @@
 from .account import Account
 from .credit_account import CreditAccount
+from .account_store import AccountStore, ColumnarAccountStore
 from .bank_herencia import BankManager
 from .database_manager import DatabaseManager
 from .data_manager import DataManager
@@ -9,6 +10,8 @@ from .charts import ChartGenerator
 __all__ = [
     'Account',
     'CreditAccount',
+    'AccountStore',
+    'ColumnarAccountStore',
     'BankManager',
     'DatabaseManager',
     'DataManager',
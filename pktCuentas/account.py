@@ -1,3 +1,6 @@
+from pktCuentas.money import from_cents, to_cents
+
+
 class Account(object):
     def __init__(self, account_number: int, last_name: str, maternal_last_name: str, first_name: str,
                  balance: float = 1000.0, date: str = None, place: str = ""):
@@ -5,11 +8,15 @@ class Account(object):
         self.__last_name = last_name
         self.__maternal_last_name = maternal_last_name
         self.__first_name = first_name
-        self.__balance = float(balance)
+        # Stored as integer cents; the getters and setters speak currency units.
+        self.__balance = to_cents(balance)
         self.__date = date
         self.__place = place
 
     def get_balance(self):
+        return from_cents(self.__balance)
+
+    def get_balance_cents(self):
         return self.__balance
 
     def get_account_number(self):
@@ -51,12 +58,16 @@ class Account(object):
         return self.__place
 
     def set_balance(self, balance: float):
-        self.__balance = float(balance)
-        return self.__balance
+        self.__balance = to_cents(balance)
+        return self.get_balance()
+
+    def set_balance_cents(self, cents: int):
+        self.__balance = int(cents)
+        return self.get_balance()
 
     def deposit(self, amount: float):
         try:
-            amount = float(amount)
+            amount = to_cents(amount)
             if amount > 0:
                 self.__balance += amount
                 return self.get_balance()
@@ -67,7 +78,7 @@ class Account(object):
 
     def withdraw(self, amount: float):
         try:
-            amount = float(amount)
+            amount = to_cents(amount)
             if amount <= 0:
                 raise ValueError('Invalid amount for withdrawal')
             if amount > self.__balance:
@@ -78,7 +89,7 @@ class Account(object):
             return e
 
     def print_account(self):
-        return f"Account No: {self.__account_number}, {self.__last_name} {self.__maternal_last_name} {self.__first_name}, Balance: {self.__balance}, Date: {self.__date}, Place: {self.__place}"
+        return f"Account No: {self.__account_number}, {self.__last_name} {self.__maternal_last_name} {self.__first_name}, Balance: {self.get_balance()}, Date: {self.__date}, Place: {self.__place}"
 
     def __str__(self):
         return self.print_account()
@@ -0,0 +1,298 @@
+import datetime
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+
+from pktCuentas.account import Account
+from pktCuentas.credit_account import CreditAccount
+from pktCuentas.money import to_cents
+
+
+class AccountStore:
+    def __init__(self):
+        self._accounts = {}
+
+    def create(self, account_no, last_name, middle_name, first_name, balance=1000.0,
+               date=None, location='', account_type='normal', credit_limit=None):
+        # credit_limit None means "not set" and keeps the default; any other
+        # value, 0 included (credit used up), is taken as is.
+        if account_type == 'credit':
+            account = CreditAccount(account_no, last_name, middle_name,
+                                    first_name, balance, date, location)
+            if credit_limit is not None:
+                account.set_credit(credit_limit)
+        else:
+            account = Account(account_no, last_name, middle_name,
+                              first_name, balance, date, location)
+        return self.add(account)
+
+    def add(self, account):
+        account_no = int(account.get_account_number())
+        if account_no in self._accounts:
+            return Exception(f'La cuenta {account_no} ya existe')
+        self._accounts[account_no] = account
+        return account
+
+    def get(self, account_no):
+        return self._accounts.get(int(account_no))
+
+    def remove(self, account_no):
+        return self._accounts.pop(int(account_no), None)
+
+    def clear(self):
+        self._accounts = {}
+
+    def __contains__(self, account_no):
+        return int(account_no) in self._accounts
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def __iter__(self):
+        return iter(list(self._accounts.values()))
+
+
+def _column_property(column):
+    def getter(self):
+        return self._store._get_value(self._account_no, column)
+
+    def setter(self, value):
+        self._store._set_value(self._account_no, column, value)
+
+    return property(getter, setter)
+
+
+class _ColumnarView:
+    __slots__ = ()
+
+    # Account methods access their name-mangled attributes, so mapping those
+    # names to the store columns lets the inherited logic run unchanged.
+    _Account__account_number = property(lambda self: self._account_no)
+    _Account__last_name = _column_property('last_name')
+    _Account__maternal_last_name = _column_property('middle_name')
+    _Account__first_name = _column_property('first_name')
+    _Account__balance = _column_property('balance')
+    _Account__date = _column_property('date')
+    _Account__place = _column_property('location')
+
+    def __init__(self, store, account_no):
+        self._store = store
+        self._account_no = account_no
+
+    def __eq__(self, other):
+        if isinstance(other, _ColumnarView):
+            return self._store is other._store and self._account_no == other._account_no
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._store), self._account_no))
+
+
+class AccountView(_ColumnarView, Account):
+    __slots__ = ('_store', '_account_no')
+
+
+class CreditAccountView(_ColumnarView, CreditAccount):
+    __slots__ = ('_store', '_account_no')
+
+    credit = _column_property('credit_limit')
+
+
+class ColumnarAccountStore:
+    TYPE_NORMAL = 0
+    TYPE_CREDIT = 1
+    DEFAULT_CREDIT_LIMIT = 500.0
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        # Rows loaded in ascending account order are found by bisecting the
+        # account_no column; only out-of-order rows need a dict entry.
+        self._sorted_rows = 0
+        self._overflow = {}
+        self._live = 0
+        self._account_no = array('q')
+        # Money columns hold integer cents, as Account does.
+        self._balance = array('q')
+        self._credit_limit = array('q')
+        self._date = array('i')
+        self._type = array('b')
+        self._alive = bytearray()
+        self._last_name = []
+        self._middle_name = []
+        self._first_name = []
+        self._location = []
+        self._raw_dates = {}
+        self._dead = 0
+
+    @staticmethod
+    def _intern(value):
+        return sys.intern(str(value)) if value is not None else ''
+
+    @staticmethod
+    def _to_ordinal(value):
+        if value is None or value == '':
+            return 0
+        if isinstance(value, datetime.datetime):
+            return value.date().toordinal()
+        if isinstance(value, datetime.date):
+            return value.toordinal()
+        try:
+            return datetime.date.fromisoformat(str(value).strip()[:10]).toordinal()
+        except ValueError:
+            return -1
+
+    def _row(self, account_no):
+        row = bisect_left(self._account_no, account_no, 0, self._sorted_rows)
+        if row < self._sorted_rows and self._account_no[row] == account_no and self._alive[row]:
+            return row
+        return self._overflow.get(account_no)
+
+    def _index_row(self, row):
+        account_no = self._account_no[row]
+        if row == self._sorted_rows and not self._overflow and (
+                row == 0 or self._account_no[row - 1] < account_no):
+            self._sorted_rows += 1
+        else:
+            self._overflow[account_no] = row
+
+    def create(self, account_no, last_name, middle_name, first_name, balance=1000.0,
+               date=None, location='', account_type='normal', credit_limit=None):
+        with self._lock:
+            account_no = int(account_no)
+            if self._row(account_no) is not None:
+                return Exception(f'La cuenta {account_no} ya existe')
+            is_credit = account_type == 'credit'
+            if is_credit and credit_limit is None:
+                credit_limit = self.DEFAULT_CREDIT_LIMIT
+            row = len(self._account_no)
+            self._account_no.append(account_no)
+            self._balance.append(to_cents(balance))
+            self._credit_limit.append(to_cents(credit_limit) if is_credit else 0)
+            self._type.append(self.TYPE_CREDIT if is_credit else self.TYPE_NORMAL)
+            self._alive.append(1)
+            self._last_name.append(self._intern(last_name))
+            self._middle_name.append(self._intern(middle_name))
+            self._first_name.append(self._intern(first_name))
+            self._location.append(self._intern(location))
+            self._date.append(0)
+            self._index_row(row)
+            self._live += 1
+            self._set_value(account_no, 'date', date)
+            return self.get(account_no)
+
+    def add(self, account):
+        is_credit = isinstance(account, CreditAccount)
+        return self.create(account.get_account_number(), account.get_last_name(),
+                           account.get_maternal_last_name(), account.get_first_name(),
+                           account.get_balance(), account.get_date(), account.get_place(),
+                           'credit' if is_credit else 'normal',
+                           account.get_credit_limit() if is_credit else 0.0)
+
+    def get(self, account_no):
+        with self._lock:
+            account_no = int(account_no)
+            row = self._row(account_no)
+            if row is None:
+                return None
+            if self._type[row] == self.TYPE_CREDIT:
+                return CreditAccountView(self, account_no)
+            return AccountView(self, account_no)
+
+    def remove(self, account_no):
+        with self._lock:
+            account = self.get(account_no)
+            if account is None:
+                return None
+            account_no = int(account_no)
+            row = self._row(account_no)
+            self._overflow.pop(account_no, None)
+            self._alive[row] = 0
+            self._live -= 1
+            self._last_name[row] = self._middle_name[row] = self._first_name[row] = ''
+            self._location[row] = ''
+            self._raw_dates.pop(account_no, None)
+            self._dead += 1
+            if self._dead > 1024 and self._dead > self._live:
+                self._compact()
+            return account
+
+    def _compact(self):
+        keep = [row for row in range(len(self._alive)) if self._alive[row]]
+        self._account_no = array('q', (self._account_no[r] for r in keep))
+        self._balance = array('q', (self._balance[r] for r in keep))
+        self._credit_limit = array('q', (self._credit_limit[r] for r in keep))
+        self._date = array('i', (self._date[r] for r in keep))
+        self._type = array('b', (self._type[r] for r in keep))
+        self._alive = bytearray(b'\x01' * len(keep))
+        self._last_name = [self._last_name[r] for r in keep]
+        self._middle_name = [self._middle_name[r] for r in keep]
+        self._first_name = [self._first_name[r] for r in keep]
+        self._location = [self._location[r] for r in keep]
+        self._sorted_rows = 0
+        self._overflow = {}
+        for row in range(len(keep)):
+            self._index_row(row)
+        self._dead = 0
+
+    def _get_value(self, account_no, column):
+        with self._lock:
+            row = self._row(account_no)
+            if column == 'date':
+                ordinal = self._date[row]
+                if ordinal == 0:
+                    return None
+                if ordinal < 0:
+                    return self._raw_dates.get(account_no)
+                return datetime.date.fromordinal(ordinal)
+            return getattr(self, '_' + column)[row]
+
+    def _set_value(self, account_no, column, value):
+        with self._lock:
+            row = self._row(account_no)
+            if column == 'date':
+                ordinal = self._to_ordinal(value)
+                self._date[row] = ordinal
+                if ordinal < 0:
+                    self._raw_dates[account_no] = value
+                else:
+                    self._raw_dates.pop(account_no, None)
+            elif column in ('balance', 'credit_limit'):
+                getattr(self, '_' + column)[row] = int(value)
+            else:
+                getattr(self, '_' + column)[row] = self._intern(value)
+
+    def columns(self):
+        with self._lock:
+            if self._dead:
+                self._compact()
+            return {
+                'account_no': self._account_no,
+                'last_name': self._last_name,
+                'middle_name': self._middle_name,
+                'first_name': self._first_name,
+                'balance': self._balance,
+                'date_ordinal': self._date,
+                'location': self._location,
+                'account_type': self._type,
+                'credit_limit': self._credit_limit
+            }
+
+    def __contains__(self, account_no):
+        with self._lock:
+            return self._row(int(account_no)) is not None
+
+    def __len__(self):
+        return self._live
+
+    def __iter__(self):
+        with self._lock:
+            accounts = [self._account_no[row] for row in range(len(self._alive)) if self._alive[row]]
+        return (self.get(account_no) for account_no in accounts)
@@ -1,32 +1,93 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
+import numpy as np
 import pandas as pd
+from pktCuentas.account_store import ColumnarAccountStore
 from pktCuentas.credit_account import CreditAccount
+from pktCuentas.money import cents_array
 
 class Analytics:
 
+    @staticmethod
+    def store_to_dataframe(store: ColumnarAccountStore) -> pd.DataFrame:
+        columns = store.columns()
+        if len(columns['account_no']) == 0:
+            return pd.DataFrame()
+        ordinals = np.frombuffer(columns['date_ordinal'], dtype=np.int32).astype(np.int64)
+        epoch = pd.Timestamp('1970-01-01').toordinal()
+        dates = (ordinals - epoch).astype('datetime64[D]')
+        dates[ordinals <= 0] = np.datetime64('NaT')
+        is_credit = np.frombuffer(columns['account_type'], dtype=np.int8) == ColumnarAccountStore.TYPE_CREDIT
+        balance_cents = np.frombuffer(columns['balance'], dtype=np.int64).copy()
+        credit_cents = np.frombuffer(columns['credit_limit'], dtype=np.int64).copy()
+        df = pd.DataFrame({
+            'account_no': np.frombuffer(columns['account_no'], dtype=np.int64).copy(),
+            'last_name': columns['last_name'],
+            'middle_name': columns['middle_name'],
+            'first_name': columns['first_name'],
+            'balance': balance_cents / 100,
+            'date': pd.to_datetime(dates),
+            'location': columns['location'],
+            'account_type': np.where(is_credit, 'credit', 'normal'),
+            'credit_limit': credit_cents / 100,
+            'balance_cents': balance_cents,
+            'credit_limit_cents': credit_cents
+        })
+        df.insert(4, 'full_name', df['last_name'] + ' ' + df['middle_name'] + ' ' + df['first_name'])
+        return df
+
+    @staticmethod
+    def rows_to_dataframe(batches: Iterable[List[Dict]]) -> pd.DataFrame:
+        # Takes the row batches of DatabaseManager.iter_accounts(batches=True)
+        # so only one batch of dicts is alive at a time.
+        frames = [pd.DataFrame.from_records(batch) for batch in batches if batch]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        df['balance_cents'] = cents_array(df['balance'])
+        df['credit_limit_cents'] = cents_array(df['credit_limit'])
+        df['balance'] = df['balance_cents'] / 100
+        df['credit_limit'] = df['credit_limit_cents'] / 100
+        df['location'] = df['location'].fillna('')
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        df.insert(4, 'full_name', df['last_name'] + ' ' + df['middle_name'] + ' ' + df['first_name'])
+        return df
+
     @staticmethod
     def accounts_to_dataframe(accounts: List) -> pd.DataFrame:
+        if isinstance(accounts, ColumnarAccountStore):
+            return Analytics.store_to_dataframe(accounts)
         data = []
         for acc in accounts:
             acc_type = 'credit' if isinstance(acc, CreditAccount) else 'normal'
-            credit_limit = acc.get_credit_limit() if acc_type == 'credit' else 0.0
+            credit_cents = acc.get_credit_limit_cents() if acc_type == 'credit' else 0
+            balance_cents = acc.get_balance_cents()
             data.append({
                 'account_no': acc.get_account_number(),
                 'last_name': acc.get_last_name(),
                 'middle_name': acc.get_maternal_last_name(),
                 'first_name': acc.get_first_name(),
                 'full_name': f"{acc.get_last_name()} {acc.get_maternal_last_name()} {acc.get_first_name()}",
-                'balance': acc.get_balance(),
+                'balance': balance_cents / 100,
                 'date': acc.get_date(),
                 'location': acc.get_place() if hasattr(acc, 'get_place') else '',
                 'account_type': acc_type,
-                'credit_limit': credit_limit
+                'credit_limit': credit_cents / 100,
+                'balance_cents': balance_cents,
+                'credit_limit_cents': credit_cents
             })
         df = pd.DataFrame(data)
         if not df.empty and 'date' in df.columns:
             df['date'] = pd.to_datetime(df['date'], errors='coerce')
         return df
 
+    @staticmethod
+    def _cents(df: pd.DataFrame, column: str) -> pd.Series:
+        # Sums run over the exact int64 cents columns; frames built
+        # elsewhere get them derived from the float amounts.
+        if f'{column}_cents' in df.columns:
+            return df[f'{column}_cents']
+        return pd.Series(cents_array(df[column]), index=df.index)
+
     @staticmethod
     def filter_by_balance_range(df: pd.DataFrame, min_balance: float,
                                 max_balance: float) -> pd.DataFrame:
@@ -68,8 +129,15 @@ class Analytics:
             return [str(x) for x in locs]
 
     @staticmethod
-    def get_statistics(df: pd.DataFrame) -> dict:
-        if df.empty:
+    def get_statistics(df: Optional[pd.DataFrame] = None, db_manager=None,
+                       filters: Optional[Dict] = None) -> dict:
+        # With a database the aggregation runs in SQL and df is not needed;
+        # the DataFrame path remains the fallback.
+        if db_manager is not None:
+            stats = db_manager.get_account_statistics(filters)
+            if stats is not None:
+                return stats
+        if df is None or df.empty:
             return {
                 'total_accounts': 0,
                 'total_balance': 0.0,
@@ -81,42 +149,79 @@ class Analytics:
                 'total_credit': 0.0,
                 'average_credit': 0.0
             }
+        balance = Analytics._cents(df, 'balance')
         stats = {
             'total_accounts': len(df),
-            'total_balance': df['balance'].sum(),
-            'average_balance': df['balance'].mean(),
-            'min_balance': df['balance'].min(),
-            'max_balance': df['balance'].max(),
+            'total_balance': int(balance.sum()) / 100,
+            'average_balance': int(balance.sum()) / len(df) / 100,
+            'min_balance': int(balance.min()) / 100,
+            'max_balance': int(balance.max()) / 100,
         }
         if 'account_type' in df.columns:
             stats['normal_accounts'] = (df['account_type'] == 'normal').sum()
             stats['credit_accounts'] = (df['account_type'] == 'credit').sum()
         if 'credit_limit' in df.columns:
-            stats['total_credit'] = df['credit_limit'].sum()
-            stats['average_credit'] = df['credit_limit'].mean() if df['credit_limit'].count() > 0 else 0.0
+            credit = Analytics._cents(df, 'credit_limit')
+            stats['total_credit'] = int(credit.sum()) / 100
+            stats['average_credit'] = int(credit.sum()) / len(df) / 100
         return stats
 
     @staticmethod
-    def group_by_type(df: pd.DataFrame) -> pd.DataFrame:
-        if df.empty:
+    def group_by_type(df: Optional[pd.DataFrame] = None, db_manager=None,
+                      filters: Optional[Dict] = None) -> pd.DataFrame:
+        if db_manager is not None:
+            rows = db_manager.get_type_summary(filters)
+            if rows is not None:
+                if not rows:
+                    return pd.DataFrame()
+                return pd.DataFrame(rows)[['account_type', 'count', 'total_balance']]
+        if df is None or df.empty:
             return pd.DataFrame()
-        return df.groupby('account_type').agg(
+        grouped = df.assign(balance_cents=Analytics._cents(df, 'balance')).groupby('account_type').agg(
             count=('account_no', 'count'),
-            total_balance=('balance', 'sum')
+            total_balance=('balance_cents', 'sum')
         ).reset_index()
+        grouped['total_balance'] = grouped['total_balance'] / 100
+        return grouped
 
     @staticmethod
-    def group_by_date(df: pd.DataFrame, freq: str = 'M') -> pd.DataFrame:
-        if df.empty or 'date' not in df.columns:
+    def monthly_summary(db_manager, filters: Optional[Dict] = None) -> Optional[pd.DataFrame]:
+        # Monthly buckets per account type from DatabaseManager.get_monthly_summary,
+        # with 'date' set to the first day of each month.
+        rows = db_manager.get_monthly_summary(filters)
+        if rows is None:
+            return None
+        if not rows:
+            return pd.DataFrame()
+        monthly = pd.DataFrame(rows)
+        monthly['date'] = pd.to_datetime(monthly['month'], format='%Y-%m')
+        return monthly
+
+    @staticmethod
+    def group_by_date(df: Optional[pd.DataFrame] = None, freq: str = 'M', db_manager=None,
+                      filters: Optional[Dict] = None) -> pd.DataFrame:
+        if db_manager is not None and freq in ('M', 'ME'):
+            monthly = Analytics.monthly_summary(db_manager, filters)
+            if monthly is not None:
+                if monthly.empty:
+                    return pd.DataFrame()
+                # Same shape as the Grouper path: month-end labels, empty
+                # months included with zero counts.
+                grouped = monthly.groupby('date')[['count', 'total_balance']].sum()
+                grouped.index = grouped.index + pd.offsets.MonthEnd(0)
+                return grouped.asfreq(pd.offsets.MonthEnd(), fill_value=0).rename_axis('date').reset_index()
+        if df is None or df.empty or 'date' not in df.columns:
             return pd.DataFrame()
         df = df.dropna(subset=['date'])
         if df.empty:
             return pd.DataFrame()
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        df = df.assign(date=pd.to_datetime(df['date'], errors='coerce'),
+                       balance_cents=Analytics._cents(df, 'balance'))
         grouped = df.groupby(pd.Grouper(key='date', freq=freq)).agg(
             count=('account_no', 'count'),
-            total_balance=('balance', 'sum')
+            total_balance=('balance_cents', 'sum')
         ).reset_index()
+        grouped['total_balance'] = grouped['total_balance'] / 100
         return grouped
 
     @staticmethod
@@ -1,63 +1,311 @@
+import datetime
+import threading
+from contextlib import ExitStack
+
 from pktCuentas.credit_account import CreditAccount
-from pktCuentas.account import Account
+from pktCuentas.account_store import AccountStore
+from pktCuentas.ledger import LedgerWriter
+from pktCuentas.indexes import AccountIndexes, normalize_date, normalize_location
+from pktCuentas.money import cents_to_decimal, from_cents, to_cents
+from pktCuentas.write_behind import WriteBehindBuffer
 
 
 class BankManager:
-    def __init__(self, db_manager=None):
-        self.accounts = []
+    # Rows committed late can carry an updated_at slightly older than the
+    # watermark, so delta reloads re-read a small window before it.
+    DELTA_OVERLAP = datetime.timedelta(seconds=5)
+
+    def __init__(self, db_manager=None, store=None, lazy=False, page_size=1000):
+        self._store = store if store is not None else AccountStore()
+        self._indexes = AccountIndexes()
+        self._watermark = None
+        self._page_cursor = None
+        self._fully_loaded = True
+        self._write_behind = None
+        # The registry lock guards membership changes (add/remove/reload);
+        # balance and field updates only take the lock of their account.
+        self._registry_lock = threading.RLock()
+        self._account_locks = {}
+        self._account_locks_guard = threading.Lock()
         self.db_manager = db_manager
+        self.lazy = lazy
+        self.page_size = page_size
         self.reload_from_database()
 
-    def reload_from_database(self):
-        if self.db_manager:
+    @property
+    def fully_loaded(self):
+        return self._fully_loaded
+
+    def _account_lock(self, account_no):
+        account_no = int(account_no)
+        with self._account_locks_guard:
+            lock = self._account_locks.get(account_no)
+            if lock is None:
+                lock = self._account_locks[account_no] = threading.Lock()
+            return lock
+
+    def enable_write_behind(self, max_pending=500, max_delay=2.0, durability='timed'):
+        if not self.db_manager:
+            return None
+        with self._registry_lock:
+            if self._write_behind is None:
+                self._write_behind = WriteBehindBuffer(self.db_manager, max_pending, max_delay, durability,
+                                                       on_rejected=self._resync_accounts)
+            return self._write_behind
+
+    def flush(self):
+        if self._write_behind is None:
+            return True, "No hay cambios pendientes"
+        return self._write_behind.flush()
+
+    def _resync_accounts(self, account_nos):
+        # Accounts whose buffered delta the database rejected are reloaded
+        # from it. Runs from inside a flush, possibly under an account lock,
+        # so it relies on the store's own locking rather than taking ours.
+        for account_no in account_nos:
+            acc_data = self.db_manager.get_account(account_no)
+            acc = self._store.get(account_no)
+            if acc_data is None:
+                self._indexes.remove(account_no)
+                self._store.remove(account_no)
+            elif acc is not None:
+                acc.set_balance(acc_data['balance'])
+                if isinstance(acc, CreditAccount) and acc_data.get('credit_limit') is not None:
+                    acc.set_credit(acc_data['credit_limit'])
+                self._indexes.update_balance(acc)
+
+    def reporting_db_manager(self):
+        # SQL aggregates only see committed rows, so pending write-behind
+        # deltas are flushed before reports read from the database.
+        if not self.db_manager:
+            return None
+        self.flush()
+        return self.db_manager
+
+    def get_statement(self, account_no, limit=100, date_start=None, date_end=None):
+        if not self.db_manager:
+            return []
+        self.flush()
+        return self.db_manager.get_account_statement(int(account_no), limit, date_start, date_end)
+
+    def get_write_behind_metrics(self):
+        return self._write_behind.get_metrics() if self._write_behind is not None else {}
+
+    def close(self):
+        if self._write_behind is None:
+            return True, "No hay cambios pendientes"
+        result = self._write_behind.close()
+        self._write_behind = None
+        return result
+
+    def _record_balance_change(self, acc, old_balance, old_credit, tx_type, amount):
+        # Balances are in cents; the write-behind buffer adds them up exactly.
+        if self._write_behind is not None:
+            credit = acc.get_credit_limit_cents() if isinstance(acc, CreditAccount) else 0
+            entry = LedgerWriter.entry(acc.get_account_number(), tx_type, amount,
+                                       cents_to_decimal(acc.get_balance_cents()), cents_to_decimal(credit))
+            try:
+                success, message = self._write_behind.record(int(acc.get_account_number()),
+                                                             acc.get_balance_cents() - old_balance,
+                                                             credit - old_credit, entry)
+            except Exception as e:
+                success, message = False, str(e)
+            if not success and self._write_behind.durability == 'strict':
+                # Not written, so the operation is undone in memory as well.
+                acc.set_balance_cents(old_balance)
+                if isinstance(acc, CreditAccount):
+                    acc.set_credit_cents(old_credit)
+                self._indexes.update_balance(acc)
+                return Exception(message)
+        return None
+
+    def _apply_db_delta(self, acc, amount, withdraw):
+        amount = to_cents(amount)
+        if amount <= 0:
+            return ValueError('Invalid amount for withdrawal' if withdraw else 'Invalid amount for deposit')
+        success, message, row = self.db_manager.apply_delta(acc.get_account_number(),
+                                                            cents_to_decimal(-amount if withdraw else amount))
+        if not success:
+            return Exception(message)
+        acc.set_balance(row['balance'])
+        if isinstance(acc, CreditAccount):
+            acc.set_credit(row['credit_limit'])
+        self._indexes.update_balance(acc)
+        return acc.get_balance()
+
+    @property
+    def store(self):
+        return self._store
+
+    @property
+    def accounts(self):
+        return list(self._store)
+
+    def register_account(self, account):
+        with self._registry_lock:
+            account = self._store.add(account)
+            if not isinstance(account, Exception):
+                self._indexes.add(account)
+            return account
+
+    def unregister_account(self, account_no):
+        with self._registry_lock:
+            self._indexes.remove(account_no)
+            with self._account_locks_guard:
+                self._account_locks.pop(int(account_no), None)
+            return self._store.remove(account_no)
+
+    def reload_from_database(self, delta=False):
+        with self._registry_lock:
+            return self._reload_from_database(delta)
+
+    def _reload_from_database(self, delta):
+        if self._write_behind is not None:
+            self._write_behind.flush()
+        if self.db_manager and delta and self._watermark is not None:
+            return self._reload_delta()
+        elif self.db_manager and self.lazy:
+            self._store.clear()
+            self._indexes.clear()
+            self._page_cursor = None
+            self._fully_loaded = False
+            self._watermark = self.db_manager.get_last_update()
+            self.load_next_page()
+        elif self.db_manager:
+            # Filled aside and swapped in only once the stream is complete,
+            # so a failure part way keeps the previous registry and watermark.
+            store = type(self._store)()
             try:
-                db_accounts = self.db_manager.get_all_accounts()
-                self.accounts = []
-
-                for acc_data in db_accounts:
-                    account_no = acc_data['account_no']
-                    last_name = acc_data['last_name']
-                    middle_name = acc_data['middle_name']
-                    first_name = acc_data['first_name']
-                    balance = acc_data['balance']
-                    date = acc_data.get('date')
-                    location = acc_data.get('location', '')
-                    account_type = acc_data.get('account_type', 'normal')
-                    credit_limit = acc_data.get('credit_limit', 0.0)
-
-                    if account_type == 'credit':
-                        account = CreditAccount(account_no, last_name, middle_name,
-                                                first_name, balance, date, location)
-                        if credit_limit > 0:
-                            account.set_credit(credit_limit)
-                    else:
-                        account = Account(account_no, last_name, middle_name,
-                                          first_name, balance, date, location)
-
-                    self.accounts.append(account)
+                watermark = self.db_manager.get_last_update()
+                for acc_data in self.db_manager.iter_accounts():
+                    store.create(
+                        account_no=acc_data['account_no'],
+                        last_name=acc_data['last_name'],
+                        middle_name=acc_data['middle_name'],
+                        first_name=acc_data['first_name'],
+                        balance=acc_data['balance'],
+                        date=acc_data.get('date'),
+                        location=acc_data.get('location', ''),
+                        account_type=acc_data.get('account_type', 'normal'),
+                        credit_limit=acc_data.get('credit_limit')
+                    )
             except Exception as e:
                 print(f"Error loading accounts from DB: {e}")
+                return e
+            self._store = store
+            self._watermark = watermark
+            self._fully_loaded = True
+            self._indexes.rebuild(self._store)
         else:
-            self.accounts = []
+            self._store.clear()
+            self._indexes.clear()
+            self._watermark = None
+            self._fully_loaded = True
+
+    def load_next_page(self):
+        with self._registry_lock:
+            if self._fully_loaded or not self.db_manager:
+                return []
+            loaded = []
+            try:
+                rows = self.db_manager.get_accounts_page(self._page_cursor, self.page_size)
+                for acc_data in rows:
+                    account_no = int(acc_data['account_no'])
+                    # Accounts faulted in by get_account are already registered.
+                    if account_no not in self._store:
+                        loaded.append(self._apply_row(acc_data))
+                    self._page_cursor = account_no
+                if len(rows) < self.page_size:
+                    self._fully_loaded = True
+            except Exception as e:
+                print(f"Error loading accounts page from DB: {e}")
+            return loaded
+
+    def load_all(self):
+        while not self._fully_loaded:
+            before = self._page_cursor
+            self.load_next_page()
+            if self._page_cursor == before and not self._fully_loaded:
+                break
+        return self.list_accounts()
+
+    def _reload_delta(self):
+        try:
+            changed = self.db_manager.get_accounts_changed_since(self._watermark - self.DELTA_OVERLAP)
+            for acc_data in changed:
+                account_no = int(acc_data['account_no'])
+                if self._fully_loaded or account_no in self._store or (
+                        self._page_cursor is not None and account_no <= self._page_cursor):
+                    self._apply_row(acc_data)
+                updated_at = acc_data.get('updated_at')
+                if updated_at is not None and updated_at > self._watermark:
+                    self._watermark = updated_at
+
+            # Every change since the last load has been applied, so any surplus
+            # of local accounts over the table size comes from deleted rows.
+            db_count = self.db_manager.count_accounts() if self._fully_loaded else -1
+            if 0 <= db_count != len(self._store):
+                db_numbers = set(self.db_manager.get_account_numbers())
+                if db_numbers or db_count == 0:
+                    for acc in list(self._store):
+                        if acc.get_account_number() not in db_numbers:
+                            self.unregister_account(acc.get_account_number())
+        except Exception as e:
+            print(f"Error loading account changes from DB: {e}")
+            return e
+
+    def _apply_row(self, acc_data):
+        account_no = int(acc_data['account_no'])
+        account_type = acc_data.get('account_type', 'normal')
+        # A stored 0 is credit used up, not a missing limit.
+        credit_limit = acc_data.get('credit_limit')
+        acc = self._store.get(account_no)
+        if acc is not None and isinstance(acc, CreditAccount) != (account_type == 'credit'):
+            self.unregister_account(account_no)
+            acc = None
+        if acc is None:
+            acc = self._store.create(account_no, acc_data['last_name'], acc_data['middle_name'],
+                                     acc_data['first_name'], acc_data['balance'], acc_data.get('date'),
+                                     acc_data.get('location', ''), account_type, credit_limit)
+        else:
+            acc.set_last_name(acc_data['last_name'])
+            acc.set_maternal_last_name(acc_data['middle_name'])
+            acc.set_first_name(acc_data['first_name'])
+            acc.set_balance(acc_data['balance'])
+            acc.set_date(acc_data.get('date'))
+            acc.set_place(acc_data.get('location', ''))
+            if isinstance(acc, CreditAccount) and credit_limit is not None:
+                acc.set_credit(credit_limit)
+        self._indexes.add(acc)
+        return acc
 
     def get_account(self, account_no):
-        return next((acc for acc in self.accounts if acc.get_account_number() == int(account_no)), None)
+        acc = self._store.get(account_no)
+        if acc is None and not self._fully_loaded and self.db_manager:
+            with self._registry_lock:
+                acc = self._store.get(account_no)
+                if acc is None:
+                    acc_data = self.db_manager.get_account(int(account_no))
+                    if acc_data:
+                        acc = self._apply_row(acc_data)
+        return acc
 
     def add_account(self, account_no, last_name, middle_name, first_name,
                     account_type, balance, date, location, credit=0.0):
+        with self._registry_lock:
+            return self._add_account(account_no, last_name, middle_name, first_name,
+                                     account_type, balance, date, location, credit)
+
+    def _add_account(self, account_no, last_name, middle_name, first_name,
+                     account_type, balance, date, location, credit):
         try:
             if self.get_account(account_no):
                 return Exception(f'La cuenta {account_no} ya existe')
-            if account_type == 'credit':
-                new_account = CreditAccount(account_no, last_name, middle_name,
-                                            first_name, balance, date, location)
-                if credit > 0:
-                    new_account.set_credit(credit)
-            else:
-                new_account = Account(account_no, last_name, middle_name,
-                                      first_name, balance, date, location)
-
-            self.accounts.append(new_account)
+            # A new account without a credit amount gets the default limit.
+            new_account = self._store.create(account_no, last_name, middle_name, first_name,
+                                             balance, date, location, account_type,
+                                             credit if credit and credit > 0 else None)
+            self._indexes.add(new_account)
 
             if self.db_manager:
                 db_account_type = 'credit' if isinstance(new_account, CreditAccount) else 'normal'
@@ -76,7 +324,7 @@ class BankManager:
                 )
 
                 if not success:
-                    self.accounts.remove(new_account)
+                    self.unregister_account(new_account.get_account_number())
                     raise Exception(f'Error al insertar en BD: {message}')
 
             return new_account
@@ -90,14 +338,19 @@ class BankManager:
 
     def remove_account(self, account):
         try:
-            if account not in self.accounts:
-                return Exception('Cuenta no encontrada')
-            self.accounts.remove(account)
-            if self.db_manager:
-                success, message = self.db_manager.delete_account(account.get_account_number())
-                if not success:
-                    self.accounts.append(account)
-                    raise Exception(f'Error al eliminar de BD: {message}')
+            with self._registry_lock, self._account_lock(account.get_account_number()):
+                if self.get_account(account.get_account_number()) != account:
+                    return Exception('Cuenta no encontrada')
+                if self._write_behind is not None:
+                    # A delta left in the buffer would outlive the row.
+                    success, message = self._write_behind.flush()
+                    if not success and self._write_behind.has_pending(account.get_account_number()):
+                        raise Exception(f'Error al sincronizar saldos: {message}')
+                if self.db_manager:
+                    success, message = self.db_manager.delete_account(account.get_account_number())
+                    if not success:
+                        raise Exception(f'Error al eliminar de BD: {message}')
+                self.unregister_account(account.get_account_number())
 
             return True
         except Exception as e:
@@ -106,18 +359,51 @@ class BankManager:
     def list_accounts(self):
         return self.accounts
 
+    def _resolve(self, account_nos):
+        return [acc for acc in map(self._store.get, account_nos) if acc is not None]
+
+    def find_by_balance_range(self, min_balance=None, max_balance=None):
+        low = to_cents(min_balance) if min_balance is not None else None
+        high = to_cents(max_balance) if max_balance is not None else None
+        return self._resolve(self._indexes.balance_range(low, high))
+
+    def find_by_date_range(self, date_start=None, date_end=None):
+        return self._resolve(self._indexes.date_range(normalize_date(date_start),
+                                                      normalize_date(date_end)))
+
+    def find_by_location(self, location=None):
+        loc = normalize_location(location)
+        if loc is None or loc in ('all', 'todas'):
+            return self.list_accounts()
+        return self._resolve(self._indexes.with_location(loc))
+
+    def find_by_account_type(self, acc_type):
+        if acc_type in (None, 'all', 'todas'):
+            return self.list_accounts()
+        return self._resolve(self._indexes.with_account_type(acc_type))
+
     def handle_list_accounts(self):
-        return self.accounts
+        return self.list_accounts()
 
     def deposit_to_account(self, account_no, amount):
         try:
-            acc = self.get_account(account_no)
-            if not acc:
+            if not self.get_account(account_no):
                 return Exception('Cuenta no encontrada')
+            with self._account_lock(account_no):
+                acc = self._store.get(account_no)
+                if not acc:
+                    return Exception('Cuenta no encontrada')
+                if self.db_manager and self._write_behind is None:
+                    return self._apply_db_delta(acc, amount, withdraw=False)
 
-            result = acc.deposit(amount)
-            if self.db_manager and not isinstance(result, Exception):
-                self.db_manager.update_account(account_no, balance=acc.get_balance())
+                old_balance = acc.get_balance_cents()
+                old_credit = acc.get_credit_limit_cents() if isinstance(acc, CreditAccount) else 0
+                result = acc.deposit(amount)
+                if not isinstance(result, Exception):
+                    self._indexes.update_balance(acc)
+                    error = self._record_balance_change(acc, old_balance, old_credit, LedgerWriter.TX_DEPOSIT, amount)
+                    if error is not None:
+                        return error
 
             return result
         except Exception as e:
@@ -125,18 +411,166 @@ class BankManager:
 
     def withdraw_from_account(self, account_no, amount):
         try:
-            acc = self.get_account(account_no)
-            if not acc:
+            if not self.get_account(account_no):
                 return Exception('Cuenta no encontrada')
+            with self._account_lock(account_no):
+                acc = self._store.get(account_no)
+                if not acc:
+                    return Exception('Cuenta no encontrada')
+                if self.db_manager and self._write_behind is None:
+                    return self._apply_db_delta(acc, amount, withdraw=True)
 
-            result = acc.withdraw(amount)
-            if self.db_manager and not isinstance(result, Exception):
-                self.db_manager.update_account(account_no, balance=acc.get_balance())
+                old_balance = acc.get_balance_cents()
+                old_credit = acc.get_credit_limit_cents() if isinstance(acc, CreditAccount) else 0
+                result = acc.withdraw(amount)
+                if not isinstance(result, Exception):
+                    self._indexes.update_balance(acc)
+                    error = self._record_balance_change(acc, old_balance, old_credit, LedgerWriter.TX_WITHDRAWAL, amount)
+                    if error is not None:
+                        return error
 
             return result
         except Exception as e:
             return e
 
+    BATCH_ALL_OR_NOTHING = 'all_or_nothing'
+    BATCH_BEST_EFFORT = 'best_effort'
+
+    @staticmethod
+    def _parse_operation(operation):
+        if isinstance(operation, dict):
+            return operation.get('account_no'), operation.get('type'), operation.get('amount')
+        account_no, op_type, amount = operation
+        return account_no, op_type, amount
+
+    def _simulate_operation(self, state, account_no, op_type, amount):
+        try:
+            account_no = int(account_no)
+        except (TypeError, ValueError):
+            return None, f'Número de cuenta inválido: {account_no}'
+        if op_type not in ('deposit', 'withdraw'):
+            return None, f'Operación inválida: {op_type}'
+        try:
+            amount = to_cents(amount)
+        except ValueError:
+            return None, f'Monto inválido: {amount}'
+        if account_no not in state:
+            acc = self._store.get(account_no)
+            if not acc:
+                return None, 'Cuenta no encontrada'
+            is_credit = isinstance(acc, CreditAccount)
+            state[account_no] = [acc.get_balance_cents(), acc.get_credit_limit_cents() if is_credit else 0,
+                                 is_credit]
+        balance, credit, is_credit = state[account_no]
+
+        if op_type == 'deposit':
+            if amount <= 0:
+                return None, 'Invalid amount for deposit'
+            state[account_no][0] = balance + amount
+        elif amount <= 0:
+            return None, 'Monto inválido para retiro' if is_credit else 'Invalid amount for withdrawal'
+        elif amount <= balance:
+            state[account_no][0] = balance - amount
+        elif is_credit and amount <= balance + credit:
+            state[account_no][0] = 0
+            state[account_no][1] = credit - (amount - balance)
+        else:
+            return None, 'Saldo y crédito insuficiente' if is_credit else 'Insufficient funds'
+        return (account_no, amount, list(state[account_no])), None
+
+    def apply_batch(self, operations, mode='all_or_nothing'):
+        report = {
+            'mode': mode,
+            'applied': 0,
+            'failed': 0,
+            'committed': False,
+            'message': '',
+            'results': []
+        }
+        if mode not in (self.BATCH_ALL_OR_NOTHING, self.BATCH_BEST_EFFORT):
+            report['message'] = f'Modo de lote inválido: {mode}'
+            return report
+
+        operations = list(operations)
+        account_nos = set()
+        for operation in operations:
+            try:
+                account_no = int(self._parse_operation(operation)[0])
+            except (TypeError, ValueError):
+                continue
+            # Fault lazily loaded accounts in before taking the account locks.
+            if self.get_account(account_no) is not None:
+                account_nos.add(account_no)
+        with ExitStack() as stack:
+            for account_no in sorted(account_nos):
+                stack.enter_context(self._account_lock(account_no))
+            return self._apply_batch_locked(operations, mode, report)
+
+    def _apply_batch_locked(self, operations, mode, report):
+        state = {}
+        valid = []
+        for index, operation in enumerate(operations):
+            try:
+                account_no, op_type, amount = self._parse_operation(operation)
+            except (TypeError, ValueError):
+                account_no = op_type = amount = None
+            applied, error = self._simulate_operation(state, account_no, op_type, amount)
+            result = {'index': index, 'account_no': account_no, 'type': op_type,
+                      'amount': amount, 'success': error is None, 'message': error or 'OK'}
+            if applied is not None:
+                result['balance'] = from_cents(applied[2][0])
+                valid.append((result, op_type, applied))
+            report['results'].append(result)
+
+        failed = [r for r in report['results'] if not r['success']]
+        if failed and mode == self.BATCH_ALL_OR_NOTHING:
+            for result, _, _ in valid:
+                result['success'] = False
+                result['message'] = 'No aplicada: el lote fue rechazado'
+                result.pop('balance', None)
+            report['failed'] = len(report['results'])
+            report['message'] = f'Lote rechazado: {len(failed)} operaciones inválidas'
+            return report
+
+        originals = {}
+        for account_no in state:
+            acc = self._store.get(account_no)
+            originals[account_no] = (acc.get_balance_cents(),
+                                     acc.get_credit_limit_cents() if isinstance(acc, CreditAccount) else 0)
+
+        if self.db_manager and valid:
+            self.flush()
+            deltas = [(account_no, cents_to_decimal(state[account_no][0] - original[0]),
+                       cents_to_decimal(state[account_no][1] - original[1]))
+                      for account_no, original in originals.items()
+                      if state[account_no][0] != original[0] or state[account_no][1] != original[1]]
+            ledger = [LedgerWriter.entry(account_no, LedgerWriter.TX_DEPOSIT if op_type == 'deposit'
+                                         else LedgerWriter.TX_WITHDRAWAL, cents_to_decimal(amount),
+                                         cents_to_decimal(snapshot[0]), cents_to_decimal(snapshot[1]))
+                      for _, op_type, (account_no, amount, snapshot) in valid]
+            success, message, _ = self.db_manager.apply_balance_deltas(deltas, ledger)
+            if not success:
+                for result, _, _ in valid:
+                    result['success'] = False
+                    result['message'] = message
+                    result.pop('balance', None)
+                report['failed'] = len(report['results'])
+                report['message'] = message
+                return report
+
+        for account_no, (balance, credit, is_credit) in state.items():
+            acc = self._store.get(account_no)
+            acc.set_balance_cents(balance)
+            if is_credit:
+                acc.set_credit_cents(credit)
+            self._indexes.update_balance(acc)
+
+        report['applied'] = len(valid)
+        report['failed'] = len(failed)
+        report['committed'] = bool(valid)
+        report['message'] = f'{len(valid)} operaciones aplicadas, {len(failed)} rechazadas'
+        return report
+
     def modify_account_fields(self, account_no, last_name=None, middle_name=None,
                              first_name=None, date=None, location=None):
         try:
@@ -144,25 +578,27 @@ class BankManager:
             if not acc:
                 return Exception('Cuenta no encontrada')
 
-            if last_name is not None:
-                acc.set_last_name(last_name)
-            if middle_name is not None:
-                acc.set_maternal_last_name(middle_name)
-            if first_name is not None:
-                acc.set_first_name(first_name)
-            if date is not None:
-                acc.set_date(date)
-            if location is not None:
-                acc.set_place(location)
-            if self.db_manager:
-                self.db_manager.update_account(
-                    account_no=account_no,
-                    last_name=acc.get_last_name(),
-                    middle_name=acc.get_maternal_last_name(),
-                    first_name=acc.get_first_name(),
-                    date=acc.get_date(),
-                    location=acc.get_place()
-                )
+            with self._account_lock(account_no):
+                if last_name is not None:
+                    acc.set_last_name(last_name)
+                if middle_name is not None:
+                    acc.set_maternal_last_name(middle_name)
+                if first_name is not None:
+                    acc.set_first_name(first_name)
+                if date is not None:
+                    acc.set_date(date)
+                if location is not None:
+                    acc.set_place(location)
+                self._indexes.add(acc)
+                if self.db_manager:
+                    self.db_manager.update_account(
+                        account_no=account_no,
+                        last_name=acc.get_last_name(),
+                        middle_name=acc.get_maternal_last_name(),
+                        first_name=acc.get_first_name(),
+                        date=acc.get_date(),
+                        location=acc.get_place()
+                    )
 
             return acc
         except Exception as e:
@@ -176,9 +612,10 @@ class BankManager:
             if not isinstance(acc, CreditAccount):
                 return Exception('La cuenta no es de crédito')
 
-            acc.set_credit(new_credit)
-            if self.db_manager:
-                self.db_manager.update_account(account_no, credit_limit=new_credit)
+            with self._account_lock(account_no):
+                acc.set_credit(new_credit)
+                if self.db_manager:
+                    self.db_manager.update_account(account_no, credit_limit=new_credit)
 
             return acc
         except Exception as e:
@@ -2,12 +2,26 @@ from typing import List
 
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 import seaborn as sns
 from matplotlib.figure import Figure
 from pktCuentas.analytics import Analytics
 
 
 class ChartGenerator:
+    # Labels and colours follow the account type of each slice, as the
+    # summary order depends on the counts and on the database backend.
+    TYPE_LABELS = {'normal': ('Cuenta Normal', 'Normal'), 'credit': ('Cuenta de Crédito', 'Crédito')}
+    TYPE_COLORS = {'normal': '#ff9999', 'credit': '#66b3ff'}
+
+    @staticmethod
+    def _type_slices(series: pd.Series):
+        # Slice labels, legend names, colours and explode offsets, by type.
+        labels = [ChartGenerator.TYPE_LABELS.get(tipo, (f'Cuenta {tipo}', str(tipo))) for tipo in series.index]
+        colors = [ChartGenerator.TYPE_COLORS.get(tipo, '#99cc99') for tipo in series.index]
+        return ([label for label, _ in labels], [name for _, name in labels], colors,
+                [0.05] * len(series))
+
     @staticmethod
     def _configure_style():
         plt.style.use('seaborn-v0_8-darkgrid')
@@ -52,24 +66,26 @@ class ChartGenerator:
         return fig
 
     @staticmethod
-    def generate_account_type_pie(accounts: List) -> Figure:
+    def generate_account_type_pie(accounts: List, db_manager=None) -> Figure:
         ChartGenerator._configure_style()
-        df = Analytics.accounts_to_dataframe(accounts)
+        summary = Analytics.group_by_type(db_manager=db_manager) if db_manager is not None else None
+        if summary is None:
+            df = Analytics.accounts_to_dataframe(accounts)
+            summary = Analytics.group_by_type(df)
 
-        if df.empty:
+        if summary.empty:
             fig, ax = plt.subplots(figsize=(10, 6))
             ax.text(0.5, 0.5, 'No hay datos para mostrar',
                    ha='center', va='center', fontsize=14)
             ax.set_title('Distribución por Tipo de Cuenta')
             return fig
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
-        tipo_counts = df['account_type'].value_counts()
-
-        colores = ['#ff9999', '#66b3ff']
-        explode = (0.05, 0.05)
+        summary = summary.set_index('account_type')
+        tipo_counts = summary['count'].sort_values(ascending=False)
 
+        etiquetas, nombres, colores, explode = ChartGenerator._type_slices(tipo_counts)
         wedges, texts, autotexts = ax1.pie(tipo_counts,
-                                           labels=['Cuenta Normal', 'Cuenta de Crédito'],
+                                           labels=etiquetas,
                                            autopct='%1.1f%%',
                                            startangle=90,
                                            colors=colores,
@@ -89,12 +105,13 @@ class ChartGenerator:
                      fontsize=13, fontweight='bold', pad=20)
 
         legend_labels = [f'{label}: {count} cuentas'
-                        for label, count in zip(['Normal', 'Crédito'], tipo_counts)]
+                        for label, count in zip(nombres, tipo_counts)]
         ax1.legend(legend_labels, loc='upper left', fontsize=10)
-        saldo_por_tipo = df.groupby('account_type')['balance'].sum()
+        saldo_por_tipo = summary['total_balance']
+        etiquetas, nombres, colores, explode = ChartGenerator._type_slices(saldo_por_tipo)
 
         wedges2, texts2, autotexts2 = ax2.pie(saldo_por_tipo,
-                                              labels=['Cuenta Normal', 'Cuenta de Crédito'],
+                                              labels=etiquetas,
                                               autopct=lambda pct: f'${pct*saldo_por_tipo.sum()/100:,.0f}\n({pct:.1f}%)',
                                               startangle=90,
                                               colors=colores,
@@ -114,15 +131,19 @@ class ChartGenerator:
                      fontsize=13, fontweight='bold', pad=20)
 
         legend_labels2 = [f'{label}: ${saldo:,.2f}'
-                         for label, saldo in zip(['Normal', 'Crédito'], saldo_por_tipo)]
+                         for label, saldo in zip(nombres, saldo_por_tipo)]
         ax2.legend(legend_labels2, loc='upper left', fontsize=10)
 
         plt.tight_layout()
         return fig
 
     @staticmethod
-    def generate_temporal_trend(accounts: List) -> Figure:
+    def generate_temporal_trend(accounts: List, db_manager=None) -> Figure:
         ChartGenerator._configure_style()
+        if db_manager is not None:
+            monthly = Analytics.monthly_summary(db_manager)
+            if monthly is not None:
+                return ChartGenerator._temporal_from_monthly(monthly)
         df = Analytics.accounts_to_dataframe(accounts)
 
         if df.empty:
@@ -147,23 +168,60 @@ class ChartGenerator:
             ax.set_title('Tendencia Temporal de Apertura de Cuentas')
             return fig
 
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
-
         df_con_fecha = df_con_fecha.sort_values('date')
 
         df_con_fecha['contador'] = 1
         df_con_fecha['cuentas_acumuladas'] = df_con_fecha['contador'].cumsum()
         df_normal = df_con_fecha[df_con_fecha['account_type'] == 'normal'].copy()
         df_credit = df_con_fecha[df_con_fecha['account_type'] == 'credit'].copy()
+        df_normal['acum_tipo'] = df_normal['contador'].cumsum()
+        df_credit['acum_tipo'] = df_credit['contador'].cumsum()
+
+        df_con_fecha['year_month'] = df_con_fecha['date'].dt.to_period('M')
+        balance_por_mes = df_con_fecha.groupby('year_month').agg({
+            'balance': ['mean', 'sum', 'count']
+        }).reset_index()
+
+        balance_por_mes.columns = ['year_month', 'balance_promedio', 'balance_total', 'cantidad']
+        return ChartGenerator._plot_temporal_trend(df_con_fecha, df_normal, df_credit, balance_por_mes)
+
+    @staticmethod
+    def _temporal_from_monthly(monthly: pd.DataFrame) -> Figure:
+        # Same chart from the monthly SQL buckets: cumulative counts advance
+        # per month instead of per account.
+        if monthly.empty:
+            fig, ax = plt.subplots(figsize=(10, 6))
+            ax.text(0.5, 0.5, 'No hay datos de fechas para mostrar',
+                   ha='center', va='center', fontsize=14)
+            ax.set_title('Tendencia Temporal de Apertura de Cuentas')
+            return fig
+
+        totales = monthly.groupby('date')[['count', 'total_balance']].sum().reset_index()
+        totales['cuentas_acumuladas'] = totales['count'].cumsum()
+        df_normal = monthly[monthly['account_type'] == 'normal'].copy()
+        df_credit = monthly[monthly['account_type'] == 'credit'].copy()
+        df_normal['acum_tipo'] = df_normal['count'].cumsum()
+        df_credit['acum_tipo'] = df_credit['count'].cumsum()
+
+        balance_por_mes = pd.DataFrame({
+            'year_month': totales['date'].dt.to_period('M'),
+            'balance_promedio': totales['total_balance'] / totales['count'],
+            'balance_total': totales['total_balance'],
+            'cantidad': totales['count']
+        })
+        return ChartGenerator._plot_temporal_trend(totales, df_normal, df_credit, balance_por_mes)
+
+    @staticmethod
+    def _plot_temporal_trend(df_con_fecha: pd.DataFrame, df_normal: pd.DataFrame,
+                             df_credit: pd.DataFrame, balance_por_mes: pd.DataFrame) -> Figure:
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
 
         if not df_normal.empty:
-            df_normal['acum_tipo'] = df_normal['contador'].cumsum()
             ax1.plot(df_normal['date'], df_normal['acum_tipo'],
                     marker='o', linestyle='-', linewidth=2, markersize=6,
                     label='Cuentas Normales', color='#ff9999')
 
         if not df_credit.empty:
-            df_credit['acum_tipo'] = df_credit['contador'].cumsum()
             ax1.plot(df_credit['date'], df_credit['acum_tipo'],
                     marker='s', linestyle='-', linewidth=2, markersize=6,
                     label='Cuentas de Crédito', color='#66b3ff')
@@ -181,12 +239,6 @@ class ChartGenerator:
         plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
 
         # Gráfica 2: Balance promedio por mes
-        df_con_fecha['year_month'] = df_con_fecha['date'].dt.to_period('M')
-        balance_por_mes = df_con_fecha.groupby('year_month').agg({
-            'balance': ['mean', 'sum', 'count']
-        }).reset_index()
-
-        balance_por_mes.columns = ['year_month', 'balance_promedio', 'balance_total', 'cantidad']
         balance_por_mes['year_month_str'] = balance_por_mes['year_month'].astype(str)
         ax2_twin = ax2.twinx()
 
@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, factory: Callable, size: int = 5, max_size: int = None, timeout: float = 10.0,
+                 validate: Callable = None, reset: Callable = None, dispose: Callable = None,
+                 validation_interval: float = 30.0, max_lifetime: float = 0):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.max_size = max(self.size, int(max_size or self.size))
+        self.timeout = timeout
+        self.validate = validate
+        self.reset = reset
+        self.dispose = dispose
+        self.validation_interval = validation_interval
+        self.max_lifetime = max_lifetime
+        self._idle = deque()
+        self._opened_at = {}
+        self._released_at = {}
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._metrics = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'exhaustion_events': 0,
+            'timeouts': 0,
+            'opened': 0,
+            'grown': 0,
+            'shrunk': 0,
+            'recycled': 0,
+            'invalid': 0
+        }
+
+    def fill(self):
+        # Opens the base size up front so the first callers do not pay for
+        # connection setup.
+        while True:
+            with self._condition:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                raw = self._open()
+            except Exception:
+                with self._condition:
+                    self._created -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._idle.append(raw)
+                self._released_at[id(raw)] = time.monotonic()
+                self._condition.notify()
+
+    def _open(self):
+        raw = self.factory()
+        with self._condition:
+            self._opened_at[id(raw)] = time.monotonic()
+            self._metrics['opened'] += 1
+        return raw
+
+    def _count(self, name):
+        with self._condition:
+            self._metrics[name] += 1
+
+    def _discard(self, raw):
+        with self._condition:
+            self._opened_at.pop(id(raw), None)
+            self._released_at.pop(id(raw), None)
+        if self.dispose is not None:
+            try:
+                self.dispose(raw)
+            except Exception:
+                pass
+
+    def get(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError('El pool de conexiones está cerrado')
+                if self._idle:
+                    raw = self._idle.pop()
+                    grow = False
+                    break
+                if self._created < self.max_size:
+                    grow = self._created >= self.size
+                    self._created += 1
+                    raw = None
+                    break
+                if not waited:
+                    waited = True
+                    self._metrics['exhaustion_events'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._metrics['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f'No hay conexiones disponibles tras {self.timeout:.1f}s '
+                        f'({self._in_use} en uso de {self.max_size})')
+                self._condition.wait(remaining)
+            self._in_use += 1
+
+        try:
+            if raw is None:
+                raw = self._open()
+                if grow:
+                    self._count('grown')
+            else:
+                raw = self._checked(raw)
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+        elapsed = time.monotonic() - started
+        with self._condition:
+            self._metrics['checkouts'] += 1
+            if waited:
+                self._metrics['waits'] += 1
+            self._metrics['wait_seconds'] += elapsed
+            self._metrics['max_wait_seconds'] = max(self._metrics['max_wait_seconds'], elapsed)
+        return raw
+
+    def _checked(self, raw):
+        now = time.monotonic()
+        if self.max_lifetime and now - self._opened_at.get(id(raw), now) > self.max_lifetime:
+            self._discard(raw)
+            self._count('recycled')
+            return self._open()
+        idle_for = now - self._released_at.get(id(raw), now)
+        if self.validate is not None and idle_for >= self.validation_interval and not self.validate(raw):
+            self._discard(raw)
+            self._count('invalid')
+            return self._open()
+        return raw
+
+    def release(self, raw, broken: bool = False):
+        if not broken and self.reset is not None:
+            try:
+                self.reset(raw)
+            except Exception:
+                broken = True
+        with self._condition:
+            self._in_use -= 1
+            # Connections opened under load are closed again once the base
+            # size is sitting idle.
+            shrink = not broken and self._created > self.size and len(self._idle) >= self.size
+            drop = broken or shrink or self._closed
+            if drop:
+                self._created -= 1
+                if shrink:
+                    self._metrics['shrunk'] += 1
+            else:
+                self._idle.append(raw)
+                self._released_at[id(raw)] = time.monotonic()
+            self._condition.notify()
+        if drop:
+            self._discard(raw)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._created -= len(idle)
+            self._condition.notify_all()
+        for raw in idle:
+            self._discard(raw)
+
+    def get_metrics(self) -> Dict:
+        with self._condition:
+            metrics = dict(self._metrics)
+            metrics['size'] = self._created
+            metrics['max_size'] = self.max_size
+            metrics['in_use'] = self._in_use
+            metrics['idle'] = len(self._idle)
+        metrics['avg_wait_seconds'] = metrics['wait_seconds'] / metrics['checkouts'] if metrics['checkouts'] else 0.0
+        return metrics
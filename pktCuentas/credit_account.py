@@ -1,16 +1,25 @@
 from pktCuentas.account import Account
+from pktCuentas.money import from_cents, to_cents
 
 class CreditAccount(Account):
     def __init__(self, account_no, last_name, middle_name, first_name, balance=1000.0, date=None, location=""):
         super().__init__(account_no, last_name, middle_name, first_name, balance, date, location)
-        self.credit = 500.0
+        # Integer cents, like the balance.
+        self.credit = 50000
 
     def get_credit_limit(self):
+        return from_cents(self.credit)
+
+    def get_credit_limit_cents(self):
         return self.credit
 
     def set_credit(self, balance):
-        self.credit = float(balance)
-        return self.credit
+        self.credit = to_cents(balance)
+        return self.get_credit_limit()
+
+    def set_credit_cents(self, cents):
+        self.credit = int(cents)
+        return self.get_credit_limit()
 
     def get_credit_limit_amount(self):
         return self.get_credit_limit()
@@ -20,15 +29,15 @@ class CreditAccount(Account):
 
     def withdraw(self, amount):
         try:
-            amount = float(amount)
+            amount = to_cents(amount)
             if amount <= 0:
                 raise ValueError('Monto inválido para retiro')
-            account_balance = super().get_balance()
+            account_balance = super().get_balance_cents()
             if amount <= account_balance:
-                return super().withdraw(amount)
-            elif amount <= (account_balance + self.get_credit_limit()):
+                return super().withdraw(from_cents(amount))
+            elif amount <= (account_balance + self.credit):
                 remaining = amount - account_balance
-                super().set_balance(0)
+                super().set_balance_cents(0)
                 self.credit -= remaining
                 return super().get_balance()
             else:
@@ -1,12 +1,157 @@
 import os
+import warnings
 from typing import Dict, List, Tuple
 
+import numpy as np
 import pandas as pd
 
 from pktCuentas.credit_account import CreditAccount
 from pktCuentas.account import Account
+from pktCuentas.money import cents_series
 
 class DataManager:
+    IMPORT_CHUNK_SIZE = 1000
+    EXPORT_CHUNK_SIZE = 10000
+
+    @staticmethod
+    def _insert_pending(db_manager, pending: List[Tuple[int, Dict]], result: Dict):
+        _, _, report = db_manager.insert_accounts_bulk([row for _, row in pending],
+                                                       DataManager.IMPORT_CHUNK_SIZE)
+        result['success'] += report['inserted']
+        result['duplicates'].extend(report['duplicates'])
+        for position, account_no, message in report['invalid']:
+            result['errors'].append(f"Row {pending[position][0] + 2}, Account {account_no}: {message}")
+
+    @staticmethod
+    def _text(column: pd.Series) -> pd.Series:
+        # str(value) for every cell; missing cells read 'nan' as str() renders them.
+        values = column.astype(object)
+        return values.where(values.notna(), 'nan').astype(str)
+
+    @staticmethod
+    def _account_numbers(column: pd.Series) -> pd.Series:
+        # Same outcome as int(value): numbers are truncated and strings must
+        # be integer literals. <NA> where the value is not a valid number.
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            is_text = pd.Series(False, index=column.index)
+        elif isinstance(column.dtype, pd.StringDtype):
+            is_text = column.notna()
+        else:
+            is_text = column.map(lambda value: isinstance(value, str)).astype(bool)
+        text = column.astype(object).where(is_text)
+        literal = text.str.strip().str.fullmatch(r'[+-]?\d+').fillna(False).astype(bool)
+        from_text = pd.to_numeric(text.where(literal), errors='coerce')
+        numbers = np.trunc(pd.to_numeric(column.astype(object).where(~is_text), errors='coerce').astype('float64'))
+        parsed = numbers.where(~is_text, from_text).astype('float64')
+        return parsed.where(np.isfinite(parsed)).astype('Int64')
+
+    @staticmethod
+    def _wall_clock(value):
+        # The per-row parse: the date as written, whatever its offset.
+        try:
+            parsed = pd.to_datetime(value)
+        except (ValueError, TypeError, OverflowError):
+            return pd.NaT
+        return parsed.tz_localize(None) if parsed.tzinfo else parsed
+
+    @staticmethod
+    def _dates(column: pd.Series) -> pd.Series:
+        # Naive datetimes, NaT where a value does not parse. Values with
+        # different offsets, or aware and naive ones together, cannot share
+        # a dtype and fall back to parsing value by value.
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', FutureWarning)
+                dates = pd.to_datetime(column, format='mixed', errors='coerce')
+            if pd.api.types.is_datetime64_any_dtype(dates):
+                return dates.dt.tz_localize(None) if dates.dt.tz is not None else dates
+        except (ValueError, TypeError):
+            pass
+        return pd.to_datetime(column.map(DataManager._wall_clock).astype(object), errors='coerce')
+
+    @staticmethod
+    def _validate_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        # Column-wise version of the per-row checks: returns the valid rows,
+        # converted, and an error frame with the file row number and the first
+        # failed check of every rejected row, in the order the checks run.
+        account_no = DataManager._account_numbers(df['account_no'])
+        names = {column: DataManager._text(df[column]).str.strip()
+                 for column in ('last_name', 'middle_name', 'first_name')}
+        balance = cents_series(df['balance'])
+        dates = DataManager._dates(df['date'])
+
+        checks = [
+            (account_no.isna(), "Invalid account number '{}'", 'account_no'),
+            ((account_no <= 0).fillna(False), "Account number must be positive", None),
+            (names['last_name'].isin(['', 'nan']), "Last name is empty", None),
+            (names['middle_name'].isin(['', 'nan']), "Middle name is empty", None),
+            (names['first_name'].isin(['', 'nan']), "First name is empty", None),
+            (balance.isna(), "Invalid balance '{}'", 'balance'),
+            ((balance < 0).fillna(False), "Balance cannot be negative", None),
+            (df['date'].notna() & dates.isna(), "Invalid date format '{}'", 'date')
+        ]
+        failed = pd.Series(False, index=df.index)
+        messages = pd.Series('', index=df.index, dtype=object)
+        for mask, message, column in checks:
+            hit = mask.astype(bool) & ~failed
+            if not hit.any():
+                continue
+            if column is None:
+                messages[hit] = message
+            else:
+                before, after = message.split('{}')
+                messages[hit] = before + DataManager._text(df.loc[hit, column]) + after
+            failed |= hit
+        errors = pd.DataFrame({'row': df.index[failed] + 2, 'message': messages[failed]})
+
+        ok = ~failed
+        location = DataManager._text(df.loc[ok, 'location']).str.strip()
+        account_type = DataManager._text(df.loc[ok, 'account_type']).str.strip().str.lower()
+        credit_limit = cents_series(df.loc[ok, 'credit_limit']).fillna(0).clip(lower=0)
+        valid = pd.DataFrame({
+            'account_no': account_no[ok].astype('int64'),
+            'last_name': names['last_name'][ok],
+            'middle_name': names['middle_name'][ok],
+            'first_name': names['first_name'][ok],
+            'balance': balance[ok].astype('int64') / 100,
+            'date': dates[ok].dt.strftime('%Y-%m-%d').astype(object).where(dates[ok].notna(), None),
+            'location': location.where(location != 'nan', ''),
+            'account_type': account_type.where(account_type.isin(['normal', 'credit']), 'normal'),
+            'credit_limit': credit_limit.astype('int64') / 100
+        })
+        return valid, errors
+
+    @staticmethod
+    def _import_frame(df: pd.DataFrame, db_manager, bank, result: Dict):
+        valid, errors = DataManager._validate_frame(df)
+        messages = list(zip(errors['row'].tolist(), errors['message'].tolist()))
+        pending = []
+        for idx, row in zip(valid.index, valid.to_dict('records')):
+            if db_manager:
+                pending.append((idx, row))
+                continue
+            try:
+                if bank.get_account(row['account_no']):
+                    result['duplicates'].append(row['account_no'])
+                    continue
+                if row['account_type'] == 'credit':
+                    account = CreditAccount(row['account_no'], row['last_name'], row['middle_name'],
+                                            row['first_name'], row['balance'], row['date'], row['location'])
+                    if row['credit_limit'] > 0:
+                        account.set_credit(row['credit_limit'])
+                else:
+                    account = Account(row['account_no'], row['last_name'], row['middle_name'],
+                                      row['first_name'], row['balance'], row['date'], row['location'])
+                bank.register_account(account)
+                result['success'] += 1
+            except Exception as e:
+                messages.append((idx + 2, f"Unexpected error - {str(e)}"))
+        messages.sort(key=lambda item: item[0])
+        result['errors'].extend(f"Row {row}: {message}" for row, message in messages)
+        if db_manager and pending:
+            DataManager._insert_pending(db_manager, pending, result)
+        if db_manager and result['success'] > 0:
+            bank.reload_from_database(delta=True)
 
     @staticmethod
     def import_from_csv(file_path: str, db_manager, bank) -> Dict:
@@ -34,117 +179,7 @@ class DataManager:
                 df['account_type'] = 'normal'
             if 'credit_limit' not in df.columns:
                 df['credit_limit'] = 0.0
-            for idx, row in df.iterrows():
-                try:
-                    try:
-                        account_no = int(row['account_no'])
-                    except (ValueError, TypeError):
-                        result['errors'].append(
-                            f"Row {idx + 2}: Invalid account number '{row['account_no']}'"
-                        )
-                        continue
-                    if account_no <= 0:
-                        result['errors'].append(
-                            f"Row {idx + 2}: Account number must be positive"
-                        )
-                        continue
-                    last_name = str(row['last_name']).strip()
-                    middle_name = str(row['middle_name']).strip()
-                    first_name = str(row['first_name']).strip()
-
-                    if not last_name or last_name == 'nan':
-                        result['errors'].append(
-                            f"Row {idx + 2}: Last name is empty"
-                        )
-                        continue
-
-                    if not middle_name or middle_name == 'nan':
-                        result['errors'].append(
-                            f"Row {idx + 2}: Middle name is empty"
-                        )
-                        continue
-
-                    if not first_name or first_name == 'nan':
-                        result['errors'].append(
-                            f"Row {idx + 2}: First name is empty"
-                        )
-                        continue
-                    try:
-                        balance = float(row['balance'])
-                        if balance < 0:
-                            result['errors'].append(
-                                f"Row {idx + 2}: Balance cannot be negative"
-                            )
-                            continue
-                    except (ValueError, TypeError):
-                        result['errors'].append(
-                            f"Row {idx + 2}: Invalid balance '{row['balance']}'"
-                        )
-                        continue
-                    date = None
-                    if pd.notna(row['date']):
-                        try:
-                            date_parsed = pd.to_datetime(row['date'])
-                            date = date_parsed.strftime('%Y-%m-%d')
-                        except:
-                            result['errors'].append(
-                                f"Row {idx + 2}: Invalid date format '{row['date']}'"
-                            )
-                            continue
-                    location = str(row['location']).strip() if pd.notna(row['location']) else ''
-                    if location == 'nan':
-                        location = ''
-                    account_type = str(row['account_type']).strip().lower()
-                    if account_type not in ['normal', 'credit']:
-                        account_type = 'normal'
-                    try:
-                        credit_limit = float(row['credit_limit']) if pd.notna(row['credit_limit']) else 0.0
-                        if credit_limit < 0:
-                            credit_limit = 0.0
-                    except:
-                        credit_limit = 0.0
-                    if db_manager:
-                        if db_manager.account_exists(account_no):
-                            result['duplicates'].append(account_no)
-                            continue
-                        success, message = db_manager.insert_account(
-                            account_no=account_no,
-                            last_name=last_name,
-                            middle_name=middle_name,
-                            first_name=first_name,
-                            balance=balance,
-                            date=date,
-                            location=location,
-                            account_type=account_type,
-                            credit_limit=credit_limit
-                        )
-
-                        if success:
-                            result['success'] += 1
-                        else:
-                            result['errors'].append(
-                                f"Row {idx + 2}, Account {account_no}: {message}"
-                            )
-                    else:
-                        if bank.get_account(account_no):
-                            result['duplicates'].append(account_no)
-                            continue
-                        if account_type == 'credit':
-
-                            account = CreditAccount(account_no, last_name, middle_name, first_name, balance, date, location)
-                            if credit_limit > 0:
-                                account.set_credit(credit_limit)
-                        else:
-
-                            account = Account(account_no, last_name, middle_name, first_name, balance, date, location)
-                        bank.accounts.append(account)
-                        result['success'] += 1
-                except Exception as e:
-                    result['errors'].append(
-                        f"Row {idx + 2}: Unexpected error - {str(e)}"
-                    )
-            if db_manager and result['success'] > 0:
-                bank.reload_from_database()
+            DataManager._import_frame(df, db_manager, bank, result)
 
         except FileNotFoundError:
             result['errors'].append(f"File not found: {file_path}")
@@ -155,6 +190,11 @@ class DataManager:
 
         return result
 
+    @staticmethod
+    def _write_csv_chunk(data: List[Dict], file_path: str, append: bool):
+        pd.DataFrame(data).to_csv(file_path, index=False, mode='a' if append else 'w',
+                                  header=not append, encoding='utf-8' if append else 'utf-8-sig')
+
     @staticmethod
     def export_to_csv(accounts: List, file_path: str) -> Tuple[bool, str]:
         try:
@@ -162,7 +202,10 @@ class DataManager:
             if directory and not os.path.exists(directory):
                 os.makedirs(directory)
 
+            # Rows are written in chunks, so a generator of accounts is
+            # exported without materialising the whole file in memory.
             data = []
+            written = False
             for acc in accounts:
                 account_type = 'credit' if isinstance(acc, CreditAccount) else 'normal'
                 credit_limit = acc.get_credit_limit() if isinstance(acc, CreditAccount) else 0.0
@@ -178,8 +221,12 @@ class DataManager:
                     'account_type': account_type,
                     'credit_limit': credit_limit
                 })
-            df = pd.DataFrame(data)
-            df.to_csv(file_path, index=False, encoding='utf-8-sig')
+                if len(data) >= DataManager.EXPORT_CHUNK_SIZE:
+                    DataManager._write_csv_chunk(data, file_path, written)
+                    written = True
+                    data = []
+            if data or not written:
+                DataManager._write_csv_chunk(data, file_path, written)
 
             return True, f"Data successfully exported to {file_path}"
 
@@ -281,104 +328,7 @@ class DataManager:
                 df['account_type'] = 'normal'
             if 'credit_limit' not in df.columns:
                 df['credit_limit'] = 0.0
-            for idx, row in df.iterrows():
-                try:
-                    try:
-                        account_no = int(row['account_no'])
-                    except (ValueError, TypeError):
-                        result['errors'].append(
-                            f"Row {idx + 2}: Invalid account number '{row['account_no']}'"
-                        )
-                        continue
-
-                    if account_no <= 0:
-                        result['errors'].append(f"Row {idx + 2}: Account number must be positive")
-                        continue
-
-                    last_name = str(row['last_name']).strip()
-                    middle_name = str(row['middle_name']).strip()
-                    first_name = str(row['first_name']).strip()
-
-                    if not last_name or last_name == 'nan':
-                        result['errors'].append(f"Row {idx + 2}: Last name is empty")
-                        continue
-                    if not middle_name or middle_name == 'nan':
-                        result['errors'].append(f"Row {idx + 2}: Middle name is empty")
-                        continue
-                    if not first_name or first_name == 'nan':
-                        result['errors'].append(f"Row {idx + 2}: First name is empty")
-                        continue
-
-                    try:
-                        balance = float(row['balance'])
-                        if balance < 0:
-                            result['errors'].append(f"Row {idx + 2}: Balance cannot be negative")
-                            continue
-                    except (ValueError, TypeError):
-                        result['errors'].append(f"Row {idx + 2}: Invalid balance '{row['balance']}'")
-                        continue
-
-                    date = None
-                    if pd.notna(row['date']):
-                        try:
-                            date_parsed = pd.to_datetime(row['date'])
-                            date = date_parsed.strftime('%Y-%m-%d')
-                        except:
-                            result['errors'].append(f"Row {idx + 2}: Invalid date format '{row['date']}'")
-                            continue
-
-                    location = str(row['location']).strip() if pd.notna(row['location']) else ''
-                    if location == 'nan':
-                        location = ''
-
-                    account_type = str(row['account_type']).strip().lower()
-                    if account_type not in ['normal', 'credit']:
-                        account_type = 'normal'
-
-                    try:
-                        credit_limit = float(row['credit_limit']) if pd.notna(row['credit_limit']) else 0.0
-                        if credit_limit < 0:
-                            credit_limit = 0.0
-                    except:
-                        credit_limit = 0.0
-
-                    if db_manager:
-                        if db_manager.account_exists(account_no):
-                            result['duplicates'].append(account_no)
-                            continue
-                        success, message = db_manager.insert_account(
-                            account_no=account_no,
-                            last_name=last_name,
-                            middle_name=middle_name,
-                            first_name=first_name,
-                            balance=balance,
-                            date=date,
-                            location=location,
-                            account_type=account_type,
-                            credit_limit=credit_limit
-                        )
-                        if success:
-                            result['success'] += 1
-                        else:
-                            result['errors'].append(f"Row {idx + 2}, Account {account_no}: {message}")
-                    else:
-                        if bank.get_account(account_no):
-                            result['duplicates'].append(account_no)
-                            continue
-                        if account_type == 'credit':
-                            from pktCuentas.credit_account import CreditAccount
-                            account = CreditAccount(account_no, last_name, middle_name, first_name, balance, date, location)
-                            if credit_limit > 0:
-                                account.set_credit(credit_limit)
-                        else:
-                            from pktCuentas.account import Account
-                            account = Account(account_no, last_name, middle_name, first_name, balance, date, location)
-                        bank.accounts.append(account)
-                        result['success'] += 1
-                except Exception as e:
-                    result['errors'].append(f"Row {idx + 2}: Unexpected error - {str(e)}")
-            if db_manager and result['success'] > 0:
-                bank.reload_from_database()
+            DataManager._import_frame(df, db_manager, bank, result)
 
         except FileNotFoundError:
             result['errors'].append(f"File not found: {file_path}")
@@ -1,72 +1,254 @@
-from mysql.connector import pooling, Error
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
 import configparser
+import numbers
 import os
+import time
+
+from pktCuentas.ledger import LedgerWriter
+from pktCuentas.migrations import MigrationRunner
+from pktCuentas.money import from_cents, to_cents, to_db_amount
+from pktCuentas.query_cache import QueryCache
+from pktCuentas.query_metrics import QueryMetrics, tracked
+from pktCuentas.storage_backends import BACKENDS, DB_ERRORS
 
 class DatabaseManager:
     _instance = None
-    _pool = None
-
-    def __new__(cls):
+    _shards = {}
+
+    CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'database_config.ini')
+
+    LOOKUP_CHUNK_SIZE = 1000
+    TEMP_TABLE_THRESHOLD = 50000
+
+    INSERT_ACCOUNT_QUERY = """
+                           INSERT INTO accounts
+                           (account_no, last_name, middle_name, first_name, balance,
+                            date, location, account_type, credit_limit)
+                           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) \
+                           """
+
+    GET_ACCOUNT_QUERY = """
+                        SELECT account_no,
+                               last_name,
+                               middle_name,
+                               first_name,
+                               balance, date, location, account_type, credit_limit
+                        FROM accounts
+                        WHERE account_no = %s \
+                        """
+
+    ACCOUNT_EXISTS_QUERY = "SELECT COUNT(*) FROM accounts WHERE account_no = %s"
+    ACCOUNT_TYPE_QUERY = "SELECT account_type FROM accounts WHERE account_no = %s"
+    READ_BALANCE_QUERY = "SELECT balance, credit_limit FROM accounts WHERE account_no = %s"
+    DELETE_ACCOUNT_QUERY = "DELETE FROM accounts WHERE account_no = %s"
+    # Amounts are bound as exact decimals; ROUND keeps SQLite's REAL columns
+    # on whole cents and is a no-op on MySQL's DECIMAL(15,2).
+    DEPOSIT_QUERY = "UPDATE accounts SET balance = ROUND(balance + %s, 2) WHERE account_no = %s"
+
+    # Mirrors CreditAccount.withdraw: the part of the amount not covered by
+    # the balance is taken from the credit limit. MySQL assigns left to
+    # right, so credit_limit sees the old balance.
+    WITHDRAW_QUERY = """
+                     UPDATE accounts
+                     SET credit_limit = ROUND(credit_limit - GREATEST(%s - balance, 0), 2),
+                         balance      = ROUND(GREATEST(balance - %s, 0), 2)
+                     WHERE account_no = %s
+                       AND (balance >= %s
+                         OR (account_type = 'credit' AND balance + credit_limit >= %s)) \
+                     """
+
+    # The guard keeps a stale delta from taking the balance or the credit
+    # below zero; a row it rejects matches nothing and fails the batch.
+    APPLY_DELTAS_QUERY = """
+                         UPDATE accounts
+                         SET balance = ROUND(balance + %s, 2),
+                             credit_limit = ROUND(credit_limit + %s, 2)
+                         WHERE account_no = %s
+                           AND ROUND(balance + %s, 2) >= 0
+                           AND ROUND(credit_limit + %s, 2) >= 0 \
+                         """
+
+    CHANGED_SINCE_QUERY = """
+                          SELECT account_no,
+                                 last_name,
+                                 middle_name,
+                                 first_name,
+                                 balance, date, location, account_type, credit_limit, updated_at
+                          FROM accounts
+                          WHERE updated_at >= %s
+                          ORDER BY updated_at \
+                          """
+
+    # Selecting the column itself keeps its declared type on every
+    # backend; SQLite returns aggregates as plain text.
+    LAST_UPDATE_QUERY = "SELECT updated_at FROM accounts ORDER BY updated_at DESC LIMIT 1"
+
+    # Single-key lookups prepared on every pooled connection at connect.
+    WARM_QUERIES = ((GET_ACCOUNT_QUERY, True), (ACCOUNT_EXISTS_QUERY, False))
+
+    def __new__(cls, shard: str = None):
+        # One instance for the main database and one per shard section; see
+        # pktCuentas.sharding.
+        if shard is not None:
+            if shard not in cls._shards:
+                cls._shards[shard] = super(DatabaseManager, cls).__new__(cls)
+                cls._shards[shard]._initialized = False
+            return cls._shards[shard]
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
             cls._instance._initialized = False
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, shard: str = None):
         if self._initialized:
             return
 
         self._initialized = True
         self._connection = None
-        self._load_config()
+        self.shard = shard
+        self._load_config(shard)
 
-    def _load_config(self):
+    @classmethod
+    def read_config(cls) -> configparser.ConfigParser:
+        if not os.path.exists(cls.CONFIG_PATH):
+            raise FileNotFoundError(f"Config file not found: {cls.CONFIG_PATH}")
         config = configparser.ConfigParser()
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'database_config.ini')
-
-        if not os.path.exists(config_path):
-            raise FileNotFoundError(f"Config file not found: {config_path}")
-
-        config.read(config_path)
-
-        self.config = {
-            'host': config.get('mysql', 'host'),
-            'port': config.getint('mysql', 'port'),
-            'database': config.get('mysql', 'database'),
-            'user': config.get('mysql', 'user'),
-            'password': config.get('mysql', 'password'),
-            'pool_size': config.getint('mysql', 'pool_size'),
-            'pool_name': config.get('mysql', 'pool_name')
-        }
+        config.read(cls.CONFIG_PATH)
+        return config
+
+    def _load_config(self, shard: str = None):
+        config = self.read_config()
+
+        self.backend_name = config.get('database', 'backend', fallback='mysql').strip().lower()
+        if shard is not None:
+            if not config.has_section(shard):
+                raise ValueError(f"No existe la sección del shard: {shard}")
+            self.backend_name = config.get(shard, 'backend', fallback=self.backend_name).strip().lower()
+        if self.backend_name not in BACKENDS:
+            raise ValueError(f"Backend de base de datos inválido: {self.backend_name}")
+
+        # A shard section only lists what differs from the [mysql] or
+        # [sqlite] section (database, path, ...); the rest is inherited.
+        section = self.backend_name
+        if shard is not None:
+            section = f'{shard}:{self.backend_name}'
+            inherited = dict(config[self.backend_name]) if config.has_section(self.backend_name) else {}
+            config[section] = {**inherited, **config[shard]}
+
+        if self.backend_name == 'sqlite':
+            path = config.get(section, 'path', fallback='data/banco.db')
+            if not os.path.isabs(path):
+                path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+            self.config = {
+                'path': path,
+                'pool_size': config.getint(section, 'pool_size', fallback=5),
+                'pool_max_size': config.getint(section, 'pool_max_size', fallback=10),
+                'pool_timeout': config.getfloat(section, 'pool_timeout', fallback=10.0),
+                'synchronous': config.get(section, 'synchronous', fallback='NORMAL'),
+                'cache_size_kb': config.getint(section, 'cache_size_kb', fallback=65536),
+                'mmap_size_mb': config.getint(section, 'mmap_size_mb', fallback=256),
+                'busy_timeout_ms': config.getint(section, 'busy_timeout_ms', fallback=5000)
+            }
+        else:
+            self.config = {
+                'host': config.get(section, 'host'),
+                'port': config.getint(section, 'port'),
+                'database': config.get(section, 'database'),
+                'user': config.get(section, 'user'),
+                'password': config.get(section, 'password'),
+                'pool_size': config.getint(section, 'pool_size'),
+                'pool_max_size': config.getint(section, 'pool_max_size', fallback=10),
+                'pool_timeout': config.getfloat(section, 'pool_timeout', fallback=10.0),
+                'validation_interval': config.getfloat(section, 'validation_interval', fallback=30.0),
+                'prepared_statements': config.getboolean(section, 'prepared_statements', fallback=True),
+                'warm_up': config.getboolean(section, 'warm_up', fallback=True),
+                'max_lifetime': config.getint(section, 'max_lifetime', fallback=3600)
+            }
+        self._backend = BACKENDS[self.backend_name](self.config)
+        self.auto_migrate = config.getboolean('database', 'auto_migrate', fallback=True)
+        self._migrated = False
+
+        self.cache = None
+        if config.getboolean('cache', 'enabled', fallback=False):
+            self.enable_cache(config.getint('cache', 'max_entries', fallback=256),
+                              config.getfloat('cache', 'ttl_seconds', fallback=30.0),
+                              config.getint('cache', 'max_rows', fallback=100000))
+
+        self.query_metrics = None
+        if config.getboolean('metrics', 'enabled', fallback=True):
+            self.query_metrics = QueryMetrics(
+                slow_query_ms=config.getfloat('metrics', 'slow_query_ms', fallback=200.0),
+                max_slow_queries=config.getint('metrics', 'max_slow_queries', fallback=100),
+                log_slow_queries=config.getboolean('metrics', 'log_slow_queries', fallback=True)
+            )
+
+        self.ledger = LedgerWriter(
+            batch_size=config.getint('ledger', 'batch_size', fallback=500),
+            enabled=config.getboolean('ledger', 'enabled', fallback=True)
+        )
+
+    def enable_cache(self, max_entries: int = 256, ttl: float = 30.0,
+                     max_rows: int = 100000) -> QueryCache:
+        if self.cache is None:
+            self.cache = QueryCache(max_entries, ttl, max_rows)
+        return self.cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    def get_cache_metrics(self) -> Dict:
+        return self.cache.get_metrics() if self.cache is not None else {}
+
+    def get_query_metrics(self) -> Dict:
+        return self.query_metrics.snapshot() if self.query_metrics is not None else {}
+
+    def reset_query_metrics(self):
+        if self.query_metrics is not None:
+            self.query_metrics.reset()
+
+    def _invalidate(self, account_no: int, changes: Dict = None, row_added: bool = False):
+        if self.cache is not None:
+            self.cache.invalidate_account(int(account_no), changes, row_added)
 
     def connect(self) -> bool:
         try:
-            if self._pool is None:
-                self._pool = pooling.MySQLConnectionPool(
-                    pool_name=self.config['pool_name'],
-                    pool_size=self.config['pool_size'],
-                    host=self.config['host'],
-                    port=self.config['port'],
-                    database=self.config['database'],
-                    user=self.config['user'],
-                    password=self.config['password'],
-                    autocommit=False
-                )
-            return True
-        except Error as e:
+            self._backend.connect(self.WARM_QUERIES)
+        except (OSError, *DB_ERRORS) as e:
             print(f"Database connection error: {e}")
             return False
+        if self.auto_migrate and not self._migrated:
+            success, message = self.migrate()
+            self._migrated = success
+            print(message)
+        return True
+
+    def migrate(self, target: int = None) -> Tuple[bool, str]:
+        return MigrationRunner(self).migrate(target)
+
+    def check_query_plans(self) -> List[Dict]:
+        return MigrationRunner(self).check_query_plans()
 
     def _get_connection(self):
-        if self._pool is None:
+        if not self._backend.connected:
             self.connect()
-        return self._pool.get_connection()
+        if self.query_metrics is None:
+            return self._backend.get_connection()
+        started = time.perf_counter()
+        connection = self._backend.get_connection()
+        self.query_metrics.record_pool_wait(time.perf_counter() - started)
+        return self.query_metrics.connection(connection)
+
+    def _prepared_cursor(self, connection, query: str, dictionary: bool = False):
+        cursor = self._backend.prepared_cursor(connection, query, dictionary)
+        return self.query_metrics.cursor(cursor) if self.query_metrics is not None else cursor
 
     def disconnect(self):
-        if self._pool:
-            self._pool = None
+        self._backend.disconnect()
 
+    def get_connection_metrics(self) -> Dict:
+        return self._backend.get_metrics()
+
+    @tracked
     def insert_account(self, account_no: int, last_name: str, middle_name: str,
                        first_name: str, balance: float = 1000.0, date: str = None,
                        location: str = "", account_type: str = "normal",
@@ -75,39 +257,32 @@ class DatabaseManager:
         cursor = None
 
         try:
-            if not last_name or not middle_name or not first_name:
-                return False, "Los nombres no pueden estar vacíos"
-
-            if balance < 0:
-                return False, "El balance no puede ser negativo"
-
-            if account_type not in ['normal', 'credit']:
-                return False, "Tipo de cuenta inválido"
-
-            if self.account_exists(account_no):
-                return False, f"La cuenta {account_no} ya existe"
+            invalid = self._validate_new_account(last_name, middle_name, first_name,
+                                                 balance, account_type, credit_limit)
+            if invalid:
+                return False, invalid
+            balance = to_db_amount(balance)
+            credit_limit = to_db_amount(credit_limit)
 
             connection = self._get_connection()
-            cursor = connection.cursor()
-
-            query = """
-                    INSERT INTO accounts
-                    (account_no, last_name, middle_name, first_name, balance,
-                     date, location, account_type, credit_limit)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) \
-                    """
+            cursor = self._prepared_cursor(connection, self.INSERT_ACCOUNT_QUERY)
 
             values = (account_no, last_name, middle_name, first_name,
                       balance, date, location, account_type, credit_limit)
 
-            cursor.execute(query, values)
+            cursor.execute(self.INSERT_ACCOUNT_QUERY, values)
             connection.commit()
+            self._invalidate(account_no, {'balance': balance, 'date': date, 'location': location,
+                                          'account_type': account_type, 'credit_limit': credit_limit},
+                             row_added=True)
 
             return True, f"Cuenta {account_no} insertada exitosamente"
 
-        except Error as e:
+        except DB_ERRORS as e:
             if connection:
                 connection.rollback()
+            if self._backend.is_duplicate_key(e):
+                return False, f"La cuenta {account_no} ya existe"
             return False, f"Error al insertar cuenta: {str(e)}"
 
         finally:
@@ -116,6 +291,122 @@ class DatabaseManager:
             if connection:
                 connection.close()
 
+    @tracked
+    def insert_accounts_bulk(self, rows: List[Dict], chunk_size: int = 1000) -> Tuple[bool, str, Dict]:
+        report = {
+            'inserted': 0,
+            'duplicates': [],
+            'invalid': []
+        }
+        # Positions refer to the input list so callers can map them back to
+        # their source rows; duplicates inside the input count as duplicates.
+        seen = set()
+        valid = []
+        for position, row in enumerate(rows):
+            account_no = row.get('account_no')
+            invalid = self._validate_account_no(account_no) or self._validate_new_account(
+                row.get('last_name'), row.get('middle_name'), row.get('first_name'),
+                row.get('balance', 1000.0), row.get('account_type', 'normal'), row.get('credit_limit', 0.0))
+            if invalid:
+                report['invalid'].append((position, account_no, invalid))
+            elif account_no in seen:
+                report['duplicates'].append(account_no)
+            else:
+                account_no = int(account_no)
+                seen.add(account_no)
+                valid.append((position, (account_no, row['last_name'], row['middle_name'],
+                                         row['first_name'], to_db_amount(row.get('balance', 1000.0)),
+                                         row.get('date'), row.get('location', ''),
+                                         row.get('account_type', 'normal'),
+                                         to_db_amount(row.get('credit_limit', 0.0)))))
+
+        existing = self.existing_account_numbers(seen)
+        report['duplicates'].extend(values[0] for _, values in valid if values[0] in existing)
+        valid = [(position, values) for position, values in valid if values[0] not in existing]
+
+        chunk_size = max(1, int(chunk_size))
+        for start in range(0, len(valid), chunk_size):
+            self._insert_chunk(valid[start:start + chunk_size], report)
+        # Checking every cached filter against every imported row costs more
+        # than refilling the cache.
+        if report['inserted'] and self.cache is not None:
+            self.cache.clear()
+
+        return (not report['invalid'],
+                f"{report['inserted']} cuentas insertadas, {len(report['duplicates'])} duplicadas, "
+                f"{len(report['invalid'])} inválidas",
+                report)
+
+    def _insert_chunk(self, chunk: List[Tuple[int, Tuple]], report: Dict):
+        connection = None
+        cursor = None
+
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor()
+
+            try:
+                cursor.executemany(self.INSERT_ACCOUNT_QUERY, [values for _, values in chunk])
+                connection.commit()
+                report['inserted'] += len(chunk)
+                return
+            except DB_ERRORS as e:
+                connection.rollback()
+                if not self._backend.is_duplicate_key(e):
+                    raise
+
+            # A concurrent writer inserted one of the rows after the existence
+            # lookup; retry the chunk row by row so only that row is reported.
+            duplicates = []
+            for position, values in chunk:
+                try:
+                    cursor.execute(self.INSERT_ACCOUNT_QUERY, values)
+                except DB_ERRORS as e:
+                    if not self._backend.is_duplicate_key(e):
+                        raise
+                    duplicates.append(values[0])
+            connection.commit()
+            report['inserted'] += len(chunk) - len(duplicates)
+            report['duplicates'].extend(duplicates)
+
+        except DB_ERRORS as e:
+            if connection:
+                connection.rollback()
+            report['invalid'].extend((position, values[0], f"Error al insertar cuenta: {str(e)}")
+                                     for position, values in chunk)
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @staticmethod
+    def _validate_account_no(account_no) -> Optional[str]:
+        if not isinstance(account_no, numbers.Integral) or isinstance(account_no, bool):
+            return f"Número de cuenta inválido: {account_no}"
+        if account_no <= 0:
+            return "El número de cuenta debe ser positivo"
+        return None
+
+    @staticmethod
+    def _validate_new_account(last_name: str, middle_name: str, first_name: str,
+                              balance: float, account_type: str,
+                              credit_limit: float = 0.0) -> Optional[str]:
+        if not last_name or not middle_name or not first_name:
+            return "Los nombres no pueden estar vacíos"
+        try:
+            balance = to_cents(balance)
+            to_cents(credit_limit)
+        except ValueError as e:
+            return str(e)
+        if balance < 0:
+            return "El balance no puede ser negativo"
+        if account_type not in ['normal', 'credit']:
+            return "Tipo de cuenta inválido"
+        return None
+
+    @tracked
     def update_account(self, account_no: int, last_name: str = None,
                        middle_name: str = None, first_name: str = None,
                        balance: float = None, date: str = None, location: str = None,
@@ -124,8 +415,14 @@ class DatabaseManager:
         cursor = None
 
         try:
-            if not self.account_exists(account_no):
-                return False, f"La cuenta {account_no} no existe"
+            if balance is not None:
+                balance = to_db_amount(balance)
+            if credit_limit is not None:
+                credit_limit = to_db_amount(credit_limit)
+        except ValueError as e:
+            return False, str(e)
+
+        try:
             updates = []
             values = []
 
@@ -171,11 +468,18 @@ class DatabaseManager:
             values.append(account_no)
 
             cursor.execute(query, tuple(values))
+            if cursor.rowcount == 0:
+                connection.rollback()
+                return False, f"La cuenta {account_no} no existe"
             connection.commit()
+            self._invalidate(account_no, {column: value for column, value in (
+                ('last_name', last_name), ('middle_name', middle_name), ('first_name', first_name),
+                ('balance', balance), ('date', date), ('location', location),
+                ('credit_limit', credit_limit)) if value is not None})
 
             return True, f"Cuenta {account_no} actualizada exitosamente"
 
-        except Error as e:
+        except DB_ERRORS as e:
             if connection:
                 connection.rollback()
             return False, f"Error al actualizar cuenta: {str(e)}"
@@ -186,24 +490,165 @@ class DatabaseManager:
             if connection:
                 connection.close()
 
-    def delete_account(self, account_no: int) -> Tuple[bool, str]:
+    @tracked
+    def apply_delta(self, account_no: int, delta: float) -> Tuple[bool, str, Optional[Dict]]:
         connection = None
         cursor = None
 
         try:
-            if not self.account_exists(account_no):
-                return False, f"La cuenta {account_no} no existe"
+            delta = to_db_amount(delta)
+        except ValueError as e:
+            return False, str(e), None
+
+        try:
+            if delta == 0:
+                return False, "El monto debe ser distinto de cero", None
+
+            connection = self._get_connection()
+            cursor = connection.cursor()
+
+            if delta > 0:
+                query = self.DEPOSIT_QUERY
+                values = (delta, account_no)
+            else:
+                amount = -delta
+                query = self.WITHDRAW_QUERY
+                values = (amount, amount, account_no, amount, amount)
+
+            statement = self._prepared_cursor(connection, query)
+            statement.execute(query, values)
+            updated = statement.rowcount
+            statement.close()
+
+            if updated == 0:
+                connection.rollback()
+                statement = self._prepared_cursor(connection, self.ACCOUNT_TYPE_QUERY)
+                statement.execute(self.ACCOUNT_TYPE_QUERY, (account_no,))
+                row = statement.fetchone()
+                statement.close()
+                if row is None:
+                    return False, f"La cuenta {account_no} no existe", None
+                if row[0] == 'credit':
+                    return False, "Saldo y crédito insuficiente", None
+                return False, "Insufficient funds", None
+
+            # Read back under the row lock taken by the UPDATE, before commit.
+            statement = self._prepared_cursor(connection, self.READ_BALANCE_QUERY, dictionary=True)
+            statement.execute(self.READ_BALANCE_QUERY, (account_no,))
+            result = statement.fetchone()
+            statement.close()
+            self.ledger.write(cursor, [LedgerWriter.entry_for_delta(
+                account_no, delta, result['balance'], result['credit_limit'])])
+            connection.commit()
+            if self.cache is not None:
+                self.cache.invalidate_balance(int(account_no), result['balance'])
+
+            return True, f"Cuenta {account_no} actualizada exitosamente", result
+
+        except DB_ERRORS as e:
+            if connection:
+                connection.rollback()
+            return False, f"Error al actualizar saldo: {str(e)}", None
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    def _write_balance_deltas(self, connection, cursor, deltas: List[Tuple[int, float, float]],
+                              ledger_entries: List[Tuple] = None, skip_rejected: bool = False) -> List[int]:
+        # Leaves the transaction open; the caller commits or rolls back.
+        # Returns the accounts whose guarded UPDATE matched no row. Their
+        # ledger entries are left out when skip_rejected is set; otherwise
+        # nothing else is written and the caller rolls back.
+        rejected = []
+        if deltas:
+            # One prepared UPDATE per row, so each row count can be checked;
+            # executemany only reports the total.
+            statement = self._prepared_cursor(connection, self.APPLY_DELTAS_QUERY)
+            for account_no, balance_delta, credit_delta in deltas:
+                balance_delta = to_db_amount(balance_delta)
+                credit_delta = to_db_amount(credit_delta)
+                statement.execute(self.APPLY_DELTAS_QUERY,
+                                  (balance_delta, credit_delta, account_no, balance_delta, credit_delta))
+                if statement.rowcount == 0:
+                    rejected.append(int(account_no))
+            statement.close()
+        if rejected and skip_rejected:
+            skipped = set(rejected)
+            ledger_entries = [entry for entry in ledger_entries or [] if int(entry[0]) not in skipped]
+        if ledger_entries and (skip_rejected or not rejected):
+            self.ledger.write(cursor, ledger_entries)
+        return rejected
+
+    @staticmethod
+    def _rejected_deltas_message(rejected: List[int], skipped: bool = False) -> str:
+        accounts = ', '.join(str(account_no) for account_no in sorted(rejected))
+        if skipped:
+            return f"Saldo o crédito insuficiente, o cuenta inexistente; se omitieron las cuentas {accounts}"
+        return f"Lote rechazado: saldo o crédito insuficiente, o cuenta inexistente, en las cuentas {accounts}"
+
+    def _balance_deltas_committed(self, deltas: List[Tuple[int, float, float]]):
+        if self.cache is not None:
+            for account_no, _, _ in deltas:
+                self.cache.invalidate_balance(int(account_no))
+
+    @tracked
+    def apply_balance_deltas(self, deltas: List[Tuple[int, float, float]],
+                             ledger_entries: List[Tuple] = None,
+                             skip_rejected: bool = False) -> Tuple[bool, str, List[int]]:
+        # Returns the accounts whose delta was rejected as well. By default
+        # one of them rolls back the whole batch; with skip_rejected the
+        # rest is committed without them.
+        connection = None
+        cursor = None
 
+        try:
             connection = self._get_connection()
             cursor = connection.cursor()
 
-            query = "DELETE FROM accounts WHERE account_no = %s"
-            cursor.execute(query, (account_no,))
+            rejected = self._write_balance_deltas(connection, cursor, deltas, ledger_entries, skip_rejected)
+            if rejected and not skip_rejected:
+                connection.rollback()
+                return False, self._rejected_deltas_message(rejected), rejected
+            connection.commit()
+            self._balance_deltas_committed(deltas)
+
+            if rejected:
+                return True, self._rejected_deltas_message(rejected, skipped=True), rejected
+            return True, f"{len(deltas)} cuentas actualizadas exitosamente", []
+
+        except DB_ERRORS as e:
+            if connection:
+                connection.rollback()
+            return False, f"Error al actualizar saldos: {str(e)}", []
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @tracked
+    def delete_account(self, account_no: int) -> Tuple[bool, str]:
+        connection = None
+        cursor = None
+
+        try:
+            connection = self._get_connection()
+            cursor = self._prepared_cursor(connection, self.DELETE_ACCOUNT_QUERY)
+
+            cursor.execute(self.DELETE_ACCOUNT_QUERY, (account_no,))
+            if cursor.rowcount == 0:
+                connection.rollback()
+                return False, f"La cuenta {account_no} no existe"
             connection.commit()
+            self._invalidate(account_no, {})
 
             return True, f"Cuenta {account_no} eliminada exitosamente"
 
-        except Error as e:
+        except DB_ERRORS as e:
             if connection:
                 connection.rollback()
             return False, f"Error al eliminar cuenta: {str(e)}"
@@ -214,6 +659,7 @@ class DatabaseManager:
             if connection:
                 connection.close()
 
+    @tracked
     def get_all_accounts(self) -> List[Dict]:
         connection = None
         cursor = None
@@ -237,7 +683,7 @@ class DatabaseManager:
 
             return results
 
-        except Error as e:
+        except DB_ERRORS as e:
             print(f"Error getting accounts: {e}")
             return []
 
@@ -247,30 +693,203 @@ class DatabaseManager:
             if connection:
                 connection.close()
 
-    def get_account(self, account_no: int) -> Optional[Dict]:
+    @tracked
+    def get_accounts_page(self, after_account_no: int = None, limit: int = 1000,
+                          filters: Dict = None) -> List[Dict]:
         connection = None
         cursor = None
 
+        # Keyset pagination: each page seeks past the last account_no seen
+        # on the account_no index instead of skipping OFFSET rows, so every
+        # page costs the same however deep the caller walks. Pass the
+        # account_no of the last row returned to get the next page.
         try:
             connection = self._get_connection()
             cursor = connection.cursor(dictionary=True)
+            query, values = self._filter_query(**(filters or {}), after_account_no=after_account_no,
+                                               limit=limit)
 
-            query = """
-                    SELECT account_no,
-                           last_name,
-                           middle_name,
-                           first_name,
-                           balance, date, location, account_type, credit_limit
-                    FROM accounts
-                    WHERE account_no = %s \
-                    """
+            cursor.execute(query, values)
+            results = cursor.fetchall()
+
+            return results
+
+        except DB_ERRORS as e:
+            print(f"Error getting accounts page: {e}")
+            return []
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @tracked
+    def get_accounts_changed_since(self, since) -> List[Dict]:
+        connection = None
+        cursor = None
+
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute(self.CHANGED_SINCE_QUERY, (since,))
+            results = cursor.fetchall()
+
+            return results
+
+        except DB_ERRORS as e:
+            print(f"Error getting changed accounts: {e}")
+            return []
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @tracked
+    def get_last_update(self):
+        connection = None
+        cursor = None
+
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor()
+
+            cursor.execute(self.LAST_UPDATE_QUERY)
+            row = cursor.fetchone()
+            return row[0] if row else None
 
-            cursor.execute(query, (account_no,))
+        except DB_ERRORS as e:
+            print(f"Error getting last update: {e}")
+            return None
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @tracked
+    def count_accounts(self) -> int:
+        connection = None
+        cursor = None
+
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor()
+
+            cursor.execute("SELECT COUNT(*) FROM accounts")
+            return cursor.fetchone()[0]
+
+        except DB_ERRORS as e:
+            print(f"Error counting accounts: {e}")
+            return -1
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @tracked
+    def get_account_numbers(self) -> List[int]:
+        connection = None
+        cursor = None
+
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor()
+
+            cursor.execute("SELECT account_no FROM accounts ORDER BY account_no")
+            return [row[0] for row in cursor.fetchall()]
+
+        except DB_ERRORS as e:
+            print(f"Error getting account numbers: {e}")
+            return []
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @tracked
+    def get_account_statement(self, account_no: int, limit: int = 100,
+                              date_start: str = None, date_end: str = None) -> List[Dict]:
+        connection = None
+        cursor = None
+
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor(dictionary=True)
+
+            query, values = self._statement_query(account_no, limit, date_start, date_end)
+
+            cursor.execute(query, values)
+            results = cursor.fetchall()
+
+            return results
+
+        except DB_ERRORS as e:
+            print(f"Error getting account statement: {e}")
+            return []
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @staticmethod
+    def _statement_query(account_no: int, limit: int = 100, date_start: str = None,
+                         date_end: str = None) -> Tuple[str, Tuple]:
+        conditions = ["account_no = %s"]
+        values = [account_no]
+
+        if date_start:
+            conditions.append("created_at >= %s")
+            values.append(date_start)
+
+        if date_end:
+            conditions.append("created_at <= %s")
+            values.append(date_end)
+
+        query = """
+                SELECT id, account_no, tx_type, amount, balance_after, credit_after, created_at
+                FROM transactions \
+                """
+        query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+        values.append(int(limit))
+
+        return query, tuple(values)
+
+    @tracked
+    def get_account(self, account_no: int) -> Optional[Dict]:
+        connection = None
+        cursor = None
+
+        if self.cache is not None:
+            hit, cached = self.cache.get(('account', account_no))
+            if hit:
+                return dict(cached) if cached else cached
+            generation = self.cache.generation
+
+        try:
+            connection = self._get_connection()
+            cursor = self._prepared_cursor(connection, self.GET_ACCOUNT_QUERY, dictionary=True)
+
+            cursor.execute(self.GET_ACCOUNT_QUERY, (account_no,))
             result = cursor.fetchone()
+            if self.cache is not None:
+                self.cache.put(('account', account_no), dict(result) if result else result,
+                               (int(account_no),), generation=generation)
 
             return result
 
-        except Error as e:
+        except DB_ERRORS as e:
             print(f"Error getting account: {e}")
             return None
 
@@ -280,87 +899,338 @@ class DatabaseManager:
             if connection:
                 connection.close()
 
+    @tracked
     def get_accounts_by_filter(self, account_type: str = None,
                                balance_min: float = None, balance_max: float = None,
                                date_start: str = None, date_end: str = None,
-                               location: str = None) -> List[Dict]:
+                               location: str = None, location_exact: str = None) -> List[Dict]:
         connection = None
         cursor = None
 
+        filters = {'account_type': account_type, 'balance_min': balance_min, 'balance_max': balance_max,
+                   'date_start': date_start, 'date_end': date_end, 'location': location,
+                   'location_exact': location_exact}
+        key = ('filter',) + tuple(filters.values())
+        if self.cache is not None:
+            hit, cached = self.cache.get(key)
+            if hit:
+                return [dict(row) for row in cached]
+            generation = self.cache.generation
+
         try:
             connection = self._get_connection()
             cursor = connection.cursor(dictionary=True)
-            conditions = []
-            values = []
-
-            if account_type:
-                conditions.append("account_type = %s")
-                values.append(account_type)
-
-            if balance_min is not None:
-                conditions.append("balance >= %s")
-                values.append(balance_min)
+            query, values = self._filter_query(account_type, balance_min, balance_max,
+                                               date_start, date_end, location, location_exact)
 
-            if balance_max is not None:
-                conditions.append("balance <= %s")
-                values.append(balance_max)
+            cursor.execute(query, values)
+            results = cursor.fetchall()
+            if self.cache is not None:
+                self.cache.put(key, [dict(row) for row in results],
+                               (int(row['account_no']) for row in results), filters,
+                               max(1, len(results)), generation)
 
-            if date_start:
-                conditions.append("date >= %s")
-                values.append(date_start)
+            return results
 
-            if date_end:
-                conditions.append("date <= %s")
-                values.append(date_end)
+        except DB_ERRORS as e:
+            print(f"Error filtering accounts: {e}")
+            return []
 
-            if location:
-                conditions.append("location LIKE %s")
-                values.append(f"%{location}%")
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
 
-            query = """
-                    SELECT account_no,
-                           last_name,
-                           middle_name,
-                           first_name,
-                           balance, date, location, account_type, credit_limit
-                    FROM accounts \
-                    """
+    @staticmethod
+    def _filter_conditions(account_type: str = None, balance_min: float = None,
+                           balance_max: float = None, date_start: str = None,
+                           date_end: str = None, location: str = None,
+                           location_exact: str = None) -> Tuple[List[str], List]:
+        conditions = []
+        values = []
+
+        if account_type:
+            conditions.append("account_type = %s")
+            values.append(account_type)
+
+        if balance_min is not None:
+            conditions.append("balance >= %s")
+            values.append(balance_min)
+
+        if balance_max is not None:
+            conditions.append("balance <= %s")
+            values.append(balance_max)
+
+        if date_start:
+            conditions.append("date >= %s")
+            values.append(date_start)
+
+        if date_end:
+            conditions.append("date <= %s")
+            values.append(date_end)
+
+        # A leading-wildcard LIKE cannot use an index; location_exact matches
+        # the normalized value the way BankManager.find_by_location does and
+        # is served by idx_location_norm.
+        if location:
+            conditions.append("location LIKE %s")
+            values.append(f"%{location}%")
+
+        if location_exact:
+            conditions.append("LOWER(TRIM(location)) = %s")
+            values.append(str(location_exact).strip().lower())
+
+        return conditions, values
+
+    @staticmethod
+    def _filter_query(account_type: str = None, balance_min: float = None,
+                      balance_max: float = None, date_start: str = None,
+                      date_end: str = None, location: str = None, location_exact: str = None,
+                      after_account_no: int = None, limit: int = None) -> Tuple[str, Tuple]:
+        conditions, values = DatabaseManager._filter_conditions(account_type, balance_min, balance_max,
+                                                                date_start, date_end, location,
+                                                                location_exact)
+
+        if after_account_no is not None:
+            conditions.insert(0, "account_no > %s")
+            values.insert(0, after_account_no)
+
+        query = """
+                SELECT account_no,
+                       last_name,
+                       middle_name,
+                       first_name,
+                       balance, date, location, account_type, credit_limit
+                FROM accounts \
+                """
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += " ORDER BY account_no"
+
+        if limit is not None:
+            query += " LIMIT %s"
+            values.append(int(limit))
+
+        return query, tuple(values)
+
+    def _aggregate(self, query: str, filters: Dict = None, extra_conditions: List[str] = (),
+                   group_by: str = None) -> Optional[List[Dict]]:
+        connection = None
+        cursor = None
 
+        # Aggregates run on the server and only the summary rows travel
+        # back, so their cost does not grow with what the client holds.
+        try:
+            conditions, values = self._filter_conditions(**(filters or {}))
+            conditions = list(extra_conditions) + conditions
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
+            if group_by:
+                query += f" GROUP BY {group_by} ORDER BY {group_by}"
 
-            query += " ORDER BY account_no"
-
+            connection = self._get_connection()
+            cursor = connection.cursor(dictionary=True)
             cursor.execute(query, tuple(values))
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
-            return results
+        except DB_ERRORS as e:
+            print(f"Error aggregating accounts: {e}")
+            return None
 
-        except Error as e:
-            print(f"Error filtering accounts: {e}")
-            return []
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @tracked
+    def get_account_statistics(self, filters: Dict = None) -> Optional[Dict]:
+        rows = self._aggregate("""
+                SELECT COUNT(*) AS total_accounts,
+                       SUM(CAST(ROUND(balance * 100) AS SIGNED)) AS balance_cents,
+                       MIN(balance) AS min_balance,
+                       MAX(balance) AS max_balance,
+                       SUM(CASE WHEN account_type = 'normal' THEN 1 ELSE 0 END) AS normal_accounts,
+                       SUM(CASE WHEN account_type = 'credit' THEN 1 ELSE 0 END) AS credit_accounts,
+                       SUM(CAST(ROUND(credit_limit * 100) AS SIGNED)) AS credit_cents
+                FROM accounts \
+                """, filters)
+        if not rows:
+            return None
+        # Sums are taken over integer cents, so they are exact on both
+        # backends; averages are derived from them.
+        row = rows[0]
+        count = int(row['total_accounts'] or 0)
+        balance_cents = int(row['balance_cents'] or 0)
+        credit_cents = int(row['credit_cents'] or 0)
+        return {
+            'total_accounts': count,
+            'total_balance': from_cents(balance_cents),
+            'average_balance': from_cents(balance_cents / count) if count else 0.0,
+            'min_balance': from_cents(to_cents(row['min_balance'])) if count else 0.0,
+            'max_balance': from_cents(to_cents(row['max_balance'])) if count else 0.0,
+            'normal_accounts': int(row['normal_accounts'] or 0),
+            'credit_accounts': int(row['credit_accounts'] or 0),
+            'total_credit': from_cents(credit_cents),
+            'average_credit': from_cents(credit_cents / count) if count else 0.0
+        }
+
+    @tracked
+    def get_type_summary(self, filters: Dict = None) -> Optional[List[Dict]]:
+        rows = self._aggregate("""
+                SELECT account_type,
+                       COUNT(*) AS count,
+                       SUM(CAST(ROUND(balance * 100) AS SIGNED)) AS balance_cents,
+                       MIN(balance) AS min_balance,
+                       MAX(balance) AS max_balance
+                FROM accounts \
+                """, filters, group_by='account_type')
+        if rows is None:
+            return None
+        return [{'account_type': row['account_type'], 'count': int(row['count']),
+                 'total_balance': from_cents(int(row['balance_cents'])),
+                 'average_balance': from_cents(int(row['balance_cents']) / int(row['count'])),
+                 'min_balance': from_cents(to_cents(row['min_balance'])),
+                 'max_balance': from_cents(to_cents(row['max_balance']))}
+                for row in rows]
+
+    @tracked
+    def get_monthly_summary(self, filters: Dict = None) -> Optional[List[Dict]]:
+        # Months come back as 'YYYY-MM' strings, split by account type.
+        rows = self._aggregate("""
+                SELECT SUBSTR(date, 1, 7) AS month,
+                       account_type,
+                       COUNT(*) AS count,
+                       SUM(CAST(ROUND(balance * 100) AS SIGNED)) AS balance_cents
+                FROM accounts \
+                """, filters, ["date IS NOT NULL"], group_by='month, account_type')
+        if rows is None:
+            return None
+        return [{'month': str(row['month']), 'account_type': row['account_type'],
+                 'count': int(row['count']), 'total_balance': from_cents(int(row['balance_cents']))}
+                for row in rows]
+
+    def iter_accounts(self, batch_size: int = 1000, batches: bool = False) -> Iterator:
+        return self._iter_query(*self._filter_query(), batch_size=batch_size, batches=batches)
+
+    def iter_accounts_by_filter(self, account_type: str = None,
+                                balance_min: float = None, balance_max: float = None,
+                                date_start: str = None, date_end: str = None,
+                                location: str = None, location_exact: str = None,
+                                batch_size: int = 1000, batches: bool = False) -> Iterator:
+        query, values = self._filter_query(account_type, balance_min, balance_max,
+                                           date_start, date_end, location, location_exact)
+        return self._iter_query(query, values, batch_size=batch_size, batches=batches)
+
+    def _iter_query(self, query: str, values: Tuple = (), batch_size: int = 1000,
+                    batches: bool = False) -> Iterator:
+        connection = None
+        cursor = None
+
+        # The cursor is unbuffered, so rows stream from the server batch by
+        # batch and the pooled connection stays checked out until the
+        # generator is exhausted or closed. Errors reach the consumer, as a
+        # stream cut short would otherwise look complete.
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            cursor.execute(query, values)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+
+        except DB_ERRORS as e:
+            print(f"Error streaming accounts: {e}")
+            raise
 
         finally:
+            if connection:
+                connection.consume_results()
             if cursor:
                 cursor.close()
             if connection:
                 connection.close()
 
-    def account_exists(self, account_no: int) -> bool:
+    @tracked
+    def existing_account_numbers(self, account_nos: Iterable[int]) -> Set[int]:
         connection = None
         cursor = None
 
         try:
+            account_nos = list({int(account_no) for account_no in account_nos})
+            if not account_nos:
+                return set()
+
             connection = self._get_connection()
             cursor = connection.cursor()
 
-            query = "SELECT COUNT(*) FROM accounts WHERE account_no = %s"
-            cursor.execute(query, (account_no,))
+            if len(account_nos) <= self.TEMP_TABLE_THRESHOLD:
+                existing = set()
+                for start in range(0, len(account_nos), self.LOOKUP_CHUNK_SIZE):
+                    chunk = account_nos[start:start + self.LOOKUP_CHUNK_SIZE]
+                    placeholders = ', '.join(['%s'] * len(chunk))
+                    cursor.execute(f"SELECT account_no FROM accounts WHERE account_no IN ({placeholders})",
+                                   tuple(chunk))
+                    existing.update(row[0] for row in cursor.fetchall())
+                return existing
+
+            # Very large sets are joined server side instead of sending
+            # hundreds of IN lists; the temporary table is per connection.
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_account_lookup")
+            cursor.execute("CREATE TEMPORARY TABLE tmp_account_lookup (account_no INT PRIMARY KEY) ENGINE=MEMORY")
+            cursor.executemany("INSERT INTO tmp_account_lookup (account_no) VALUES (%s)",
+                               [(account_no,) for account_no in account_nos])
+            cursor.execute("""
+                           SELECT a.account_no
+                           FROM accounts a
+                                    JOIN tmp_account_lookup t ON t.account_no = a.account_no \
+                           """)
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.execute("DROP TEMPORARY TABLE tmp_account_lookup")
+            return existing
+
+        except DB_ERRORS as e:
+            print(f"Error checking account existence: {e}")
+            return set()
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @tracked
+    def account_exists(self, account_no: int) -> bool:
+        connection = None
+        cursor = None
+
+        if self.cache is not None:
+            hit, cached = self.cache.get(('exists', account_no))
+            if hit:
+                return cached
+            generation = self.cache.generation
+
+        try:
+            connection = self._get_connection()
+            cursor = self._prepared_cursor(connection, self.ACCOUNT_EXISTS_QUERY)
+
+            cursor.execute(self.ACCOUNT_EXISTS_QUERY, (account_no,))
 
-            count = cursor.fetchone()[0]
-            return count > 0
+            exists = cursor.fetchone()[0] > 0
+            if self.cache is not None:
+                self.cache.put(('exists', account_no), exists, (int(account_no),), generation=generation)
+            return exists
 
-        except Error as e:
+        except DB_ERRORS as e:
             print(f"Error checking account existence: {e}")
             return False
 
@@ -0,0 +1,170 @@
+import datetime
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from pktCuentas.credit_account import CreditAccount
+
+
+class SortedIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._entries = []
+        self._keys = {}
+
+    def rebuild(self, pairs):
+        self._keys = {account_no: key for account_no, key in pairs if key is not None}
+        self._entries = sorted((key, account_no) for account_no, key in self._keys.items())
+
+    def add(self, account_no, key):
+        self.remove(account_no)
+        if key is None:
+            return
+        self._keys[account_no] = key
+        insort(self._entries, (key, account_no))
+
+    def remove(self, account_no):
+        key = self._keys.pop(account_no, None)
+        if key is None:
+            return
+        pos = bisect_left(self._entries, (key, account_no))
+        if pos < len(self._entries) and self._entries[pos] == (key, account_no):
+            del self._entries[pos]
+
+    def range(self, low=None, high=None):
+        start = 0 if low is None else bisect_left(self._entries, (low,))
+        end = len(self._entries) if high is None else bisect_right(self._entries, (high, float('inf')))
+        return [account_no for _, account_no in self._entries[start:end]]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HashIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._buckets = {}
+        self._keys = {}
+
+    def rebuild(self, pairs):
+        self.clear()
+        for account_no, key in pairs:
+            self.add(account_no, key)
+
+    def add(self, account_no, key):
+        self.remove(account_no)
+        if key is None:
+            return
+        self._keys[account_no] = key
+        self._buckets.setdefault(key, {})[account_no] = None
+
+    def remove(self, account_no):
+        key = self._keys.pop(account_no, None)
+        if key is None:
+            return
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pop(account_no, None)
+            if not bucket:
+                del self._buckets[key]
+
+    def get(self, key):
+        return list(self._buckets.get(key, ()))
+
+    def keys(self):
+        return list(self._buckets)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def normalize_location(location):
+    if location is None:
+        return None
+    loc = str(location).strip().lower()
+    return loc if loc and loc != 'nan' else None
+
+
+def normalize_date(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        return None
+
+
+class AccountIndexes:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.balance = SortedIndex()
+        self.date = SortedIndex()
+        self.location = HashIndex()
+        self.account_type = HashIndex()
+
+    @staticmethod
+    def _keys(account):
+        account_type = 'credit' if isinstance(account, CreditAccount) else 'normal'
+        return (account.get_balance_cents(), normalize_date(account.get_date()),
+                normalize_location(account.get_place()), account_type)
+
+    def rebuild(self, accounts):
+        rows = [(int(acc.get_account_number()), self._keys(acc)) for acc in accounts]
+        with self._lock:
+            self.balance.rebuild((no, keys[0]) for no, keys in rows)
+            self.date.rebuild((no, keys[1]) for no, keys in rows)
+            self.location.rebuild((no, keys[2]) for no, keys in rows)
+            self.account_type.rebuild((no, keys[3]) for no, keys in rows)
+
+    def add(self, account):
+        account_no = int(account.get_account_number())
+        balance, date, location, account_type = self._keys(account)
+        with self._lock:
+            self.balance.add(account_no, balance)
+            self.date.add(account_no, date)
+            self.location.add(account_no, location)
+            self.account_type.add(account_no, account_type)
+
+    def remove(self, account_no):
+        account_no = int(account_no)
+        with self._lock:
+            self.balance.remove(account_no)
+            self.date.remove(account_no)
+            self.location.remove(account_no)
+            self.account_type.remove(account_no)
+
+    def update_balance(self, account):
+        balance = account.get_balance_cents()
+        with self._lock:
+            self.balance.add(int(account.get_account_number()), balance)
+
+    def balance_range(self, low=None, high=None):
+        # Bounds in cents, like the keys.
+        with self._lock:
+            return self.balance.range(low, high)
+
+    def date_range(self, low=None, high=None):
+        with self._lock:
+            return self.date.range(low, high)
+
+    def with_location(self, location):
+        with self._lock:
+            return self.location.get(location)
+
+    def with_account_type(self, account_type):
+        with self._lock:
+            return self.account_type.get(account_type)
+
+    def clear(self):
+        with self._lock:
+            self.balance.clear()
+            self.date.clear()
+            self.location.clear()
+            self.account_type.clear()
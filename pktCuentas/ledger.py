@@ -0,0 +1,55 @@
+from typing import Iterable, List, Tuple
+
+from pktCuentas.money import cents_to_decimal, to_cents, to_db_amount
+
+
+class LedgerWriter:
+    TX_DEPOSIT = 'deposit'
+    TX_WITHDRAWAL = 'withdrawal'
+
+    COLUMNS = ('account_no', 'tx_type', 'amount', 'balance_after', 'credit_after')
+
+    def __init__(self, batch_size: int = 500, enabled: bool = True):
+        self.batch_size = max(1, int(batch_size))
+        self.enabled = enabled
+
+    @staticmethod
+    def entry(account_no: int, tx_type: str, amount: float,
+              balance_after: float = None, credit_after: float = None) -> Tuple:
+        return (int(account_no), tx_type, cents_to_decimal(abs(to_cents(amount))),
+                to_db_amount(balance_after) if balance_after is not None else None,
+                to_db_amount(credit_after) if credit_after is not None else None)
+
+    @classmethod
+    def entry_for_delta(cls, account_no: int, delta: float,
+                        balance_after: float = None, credit_after: float = None) -> Tuple:
+        tx_type = cls.TX_DEPOSIT if delta > 0 else cls.TX_WITHDRAWAL
+        return cls.entry(account_no, tx_type, delta, balance_after, credit_after)
+
+    def _insert_query(self, rows: int) -> str:
+        placeholders = '(' + ', '.join(['%s'] * len(self.COLUMNS)) + ')'
+        return (f"INSERT INTO transactions ({', '.join(self.COLUMNS)}) VALUES "
+                + ', '.join([placeholders] * rows))
+
+    def write(self, cursor, entries: Iterable[Tuple]) -> int:
+        # Runs on the caller's cursor so the rows commit or roll back together
+        # with the balance change they describe.
+        if not self.enabled:
+            return 0
+        entries = list(entries)
+        written = 0
+        full_batch_query = None
+        for start in range(0, len(entries), self.batch_size):
+            batch = entries[start:start + self.batch_size]
+            if len(batch) == self.batch_size:
+                if full_batch_query is None:
+                    full_batch_query = self._insert_query(self.batch_size)
+                query = full_batch_query
+            else:
+                query = self._insert_query(len(batch))
+            values: List = []
+            for row in batch:
+                values.extend(row)
+            cursor.execute(query, tuple(values))
+            written += len(batch)
+        return written
@@ -0,0 +1,187 @@
+from typing import Dict, List, Tuple
+
+from pktCuentas.storage_backends import DB_ERRORS
+
+
+def _create_index(backend, cursor, table: str, name: str, columns: str):
+    if not backend.index_exists(cursor, table, name):
+        cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def _drop_index(backend, cursor, table: str, name: str):
+    if backend.index_exists(cursor, table, name):
+        backend.drop_index(cursor, table, name)
+
+
+def _baseline(backend, cursor):
+    # The tables come from database/banco_schema*.sql; this version only
+    # marks the starting point.
+    if not backend.column_exists(cursor, 'accounts', 'account_no'):
+        raise RuntimeError("No existe la tabla accounts; ejecuta primero el script de esquema")
+
+
+def _filter_indexes(backend, cursor):
+    _create_index(backend, cursor, 'accounts', 'idx_type_balance', 'account_type, balance')
+    _create_index(backend, cursor, 'accounts', 'idx_balance', 'balance')
+    _create_index(backend, cursor, 'accounts', 'idx_date_account', 'date, account_no')
+    _create_index(backend, cursor, 'accounts', 'idx_updated_at', 'updated_at')
+    # account_no is already indexed by its UNIQUE key, and the single column
+    # type and date indexes are prefixes of the composite ones.
+    for name in ('idx_account_no', 'idx_account_type', 'idx_date'):
+        _drop_index(backend, cursor, 'accounts', name)
+
+
+def _normalized_location(backend, cursor):
+    # Serves LOWER(TRIM(location)) = %s. MySQL substitutes a matching
+    # generated column on its own; SQLite matches the expression index.
+    if backend.name == 'mysql':
+        if not backend.column_exists(cursor, 'accounts', 'location_norm'):
+            cursor.execute("""
+                           ALTER TABLE accounts
+                               ADD COLUMN location_norm VARCHAR(200)
+                                   GENERATED ALWAYS AS (LOWER(TRIM(location))) VIRTUAL \
+                           """)
+        _create_index(backend, cursor, 'accounts', 'idx_location_norm', 'location_norm')
+    else:
+        _create_index(backend, cursor, 'accounts', 'idx_location_norm', 'LOWER(TRIM(location))')
+
+
+def _transactions_table(backend, cursor):
+    # Databases created before the ledger existed lack the table; same
+    # definitions as database/banco_schema*.sql.
+    if backend.name == 'mysql':
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS transactions (
+                           id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                           account_no INT NOT NULL,
+                           tx_type ENUM('deposit', 'withdrawal') NOT NULL,
+                           amount DECIMAL(15,2) NOT NULL,
+                           balance_after DECIMAL(15,2),
+                           credit_after DECIMAL(15,2),
+                           created_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+                       ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci \
+                       """)
+    else:
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS transactions (
+                           id INTEGER PRIMARY KEY AUTOINCREMENT,
+                           account_no INTEGER NOT NULL,
+                           tx_type TEXT NOT NULL CHECK (tx_type IN ('deposit', 'withdrawal')),
+                           amount REAL NOT NULL,
+                           balance_after REAL,
+                           credit_after REAL,
+                           created_at TIMESTAMP NOT NULL DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))
+                       ) \
+                       """)
+    _create_index(backend, cursor, 'transactions', 'idx_tx_account_created', 'account_no, created_at')
+    _create_index(backend, cursor, 'transactions', 'idx_tx_created', 'created_at')
+
+
+class MigrationRunner:
+    # Append only: applied versions are recorded in schema_migrations and
+    # every step checks the catalog first, so a partly applied version
+    # (MySQL commits each DDL statement) can simply be run again.
+    MIGRATIONS = (
+        (1, 'Esquema base', _baseline),
+        (2, 'Índices compuestos para filtros', _filter_indexes),
+        (3, 'Índice de ubicación normalizada', _normalized_location),
+        (4, 'Tabla de movimientos', _transactions_table)
+    )
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.backend = db_manager._backend
+
+    def applied_versions(self, cursor) -> List[int]:
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS schema_migrations (
+                           version INT PRIMARY KEY,
+                           name VARCHAR(200) NOT NULL,
+                           applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                       ) \
+                       """)
+        cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+        return [row[0] for row in cursor.fetchall()]
+
+    def migrate(self, target: int = None) -> Tuple[bool, str]:
+        connection = None
+        cursor = None
+        version = None
+
+        try:
+            connection = self.db_manager._get_connection()
+            cursor = connection.cursor()
+            applied = set(self.applied_versions(cursor))
+            connection.commit()
+
+            done = []
+            for version, name, step in self.MIGRATIONS:
+                if version in applied or (target is not None and version > target):
+                    continue
+                step(self.backend, cursor)
+                cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                               (version, name))
+                connection.commit()
+                done.append(version)
+
+            current = max(applied | set(done), default=0)
+            if not done:
+                return True, f"Esquema actualizado (versión {current})"
+            return True, f"{len(done)} migraciones aplicadas, esquema en versión {current}"
+
+        except (RuntimeError, *DB_ERRORS) as e:
+            if connection:
+                connection.rollback()
+            return False, f"Error aplicando la migración {version}: {e}"
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    def _plan_checks(self) -> List[Tuple[str, str, Tuple]]:
+        db = self.db_manager
+        return [
+            ('get_account', db.GET_ACCOUNT_QUERY, (1,)),
+            ('account_exists', db.ACCOUNT_EXISTS_QUERY, (1,)),
+            ('deposit', db.DEPOSIT_QUERY, (0, 1)),
+            ('withdraw', db.WITHDRAW_QUERY, (0, 0, 1, 0, 0)),
+            ('apply_deltas', db.APPLY_DELTAS_QUERY, (0, 0, 1, 0, 0)),
+            ('delete_account', db.DELETE_ACCOUNT_QUERY, (1,)),
+            ('existing_account_numbers', "SELECT account_no FROM accounts WHERE account_no IN (%s, %s)", (1, 2)),
+            ('accounts_page', *db._filter_query(after_account_no=0, limit=1000)),
+            ('filter_type_balance', *db._filter_query(account_type='credit', balance_min=0, balance_max=100)),
+            ('filter_balance', *db._filter_query(balance_min=0, balance_max=100)),
+            ('filter_date', *db._filter_query(date_start='2025-01-01', date_end='2025-01-31')),
+            ('filter_location', *db._filter_query(location_exact='guadalajara')),
+            ('changed_since', db.CHANGED_SINCE_QUERY, ('2025-01-01 00:00:00',)),
+            ('last_update', db.LAST_UPDATE_QUERY, ()),
+            ('account_statement', *db._statement_query(1, 100, '2025-01-01', '2025-12-31'))
+        ]
+
+    def check_query_plans(self) -> List[Dict]:
+        # Substring location filters (LIKE '%x%') and the whole-table
+        # aggregates scan by design and are not listed.
+        connection = None
+        cursor = None
+        results = []
+
+        try:
+            connection = self.db_manager._get_connection()
+            cursor = connection.cursor()
+            for name, query, values in self._plan_checks():
+                uses_index, plan = self.backend.explain(cursor, query, values)
+                results.append({'query': name, 'uses_index': uses_index, 'plan': plan})
+            return results
+
+        except DB_ERRORS as e:
+            print(f"Error checking query plans: {e}")
+            return results
+
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.rollback()
+                connection.close()
@@ -0,0 +1,73 @@
+import math
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+import numpy as np
+import pandas as pd
+
+# Amounts are handled as integer cents everywhere money is stored or
+# added up; currency units only appear at the edges (UI, files, SQL
+# parameters), so sums and comparisons are exact.
+
+CENT = Decimal('0.01')
+
+
+def to_cents(amount) -> int:
+    if isinstance(amount, bool):
+        raise ValueError(f'Monto inválido: {amount}')
+    if isinstance(amount, int):
+        return amount * 100
+    if isinstance(amount, float):
+        if not math.isfinite(amount):
+            raise ValueError(f'Monto inválido: {amount}')
+        scaled = amount * 100
+        cents = round(scaled)
+        # Values that already have at most two decimals land within float
+        # noise of an integer; anything else is rounded half up exactly.
+        if abs(scaled - cents) < 1e-6:
+            return int(cents)
+    try:
+        value = amount if isinstance(amount, Decimal) else Decimal(str(amount).strip())
+        if not value.is_finite():
+            raise ValueError(f'Monto inválido: {amount}')
+        return int(value.quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f'Monto inválido: {amount}')
+
+
+def from_cents(cents: int) -> float:
+    return cents / 100
+
+
+def cents_to_decimal(cents: int) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def to_db_amount(amount) -> Decimal:
+    # DECIMAL(15,2) parameters are bound as exact decimals, never floats.
+    return cents_to_decimal(to_cents(amount))
+
+
+def cents_series(values: pd.Series) -> pd.Series:
+    # Vectorized to_cents: a nullable Int64 series with <NA> where the value
+    # is missing or not a number. Only values with more than two decimals
+    # go through the exact scalar path.
+    numeric = pd.to_numeric(values, errors='coerce').astype('float64')
+    scaled = numeric.to_numpy() * 100
+    # Amounts past the int64 range cannot be held in cents; they count as
+    # invalid like any other unusable value.
+    finite = np.isfinite(scaled) & (np.abs(scaled) < 2.0 ** 62)
+    rounded = np.zeros(len(scaled), dtype=np.int64)
+    rounded[finite] = np.round(scaled[finite]).astype(np.int64)
+    inexact = finite & (np.abs(scaled - rounded) >= 1e-6)
+    for position in np.flatnonzero(inexact):
+        rounded[position] = to_cents(values.iloc[position])
+    result = pd.Series(rounded, index=values.index, dtype='Int64')
+    result[~finite] = pd.NA
+    return result
+
+
+def cents_array(values) -> np.ndarray:
+    # int64 cents for columns that are known to hold amounts; missing
+    # values count as zero.
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    return cents_series(series).fillna(0).to_numpy(dtype=np.int64)
@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+_UNKNOWN = object()
+
+
+class _Entry:
+    __slots__ = ('value', 'expires', 'accounts', 'filters', 'rows')
+
+    def __init__(self, value, expires, accounts, filters, rows):
+        self.value = value
+        self.expires = expires
+        self.accounts = accounts
+        self.filters = filters
+        self.rows = rows
+
+
+class QueryCache:
+    # Filter names as built by DatabaseManager._filter_query, mapped to the
+    # account column they constrain.
+    FILTER_COLUMNS = {
+        'account_type': 'account_type',
+        'balance_min': 'balance',
+        'balance_max': 'balance',
+        'date_start': 'date',
+        'date_end': 'date',
+        'location': 'location',
+        'location_exact': 'location'
+    }
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0, max_rows: int = 100000):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self.max_rows = max(1, int(max_rows))
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._metrics = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    def get(self, key: Hashable) -> Tuple[bool, object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._drop(key)
+                self._metrics['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._metrics['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._metrics['hits'] += 1
+            return True, entry.value
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, key: Hashable, value, accounts: Iterable[int] = (), filters: Dict = None,
+            rows: int = 1, generation: int = None):
+        if rows > self.max_rows:
+            return
+        with self._lock:
+            # A write committed while the query ran may already have been
+            # invalidated; caching the older result would resurrect it.
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(value, time.monotonic() + self.ttl,
+                                        frozenset(accounts), filters, rows)
+            self._rows += rows
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._drop(next(iter(self._entries)))
+                self._metrics['evictions'] += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._rows -= entry.rows
+
+    def invalidate_account(self, account_no: int, changes: Optional[Dict] = None,
+                           row_added: bool = False):
+        # changes maps the written columns to their new values (_UNKNOWN when
+        # only the fact that a column changed is known); None means nothing is
+        # known about the write. A delete passes {}: only results that held
+        # the row are affected.
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if account_no in entry.accounts
+                     or (entry.filters is not None and self._may_match(entry.filters, changes, row_added))]
+            for key in stale:
+                self._drop(key)
+            self._generation += 1
+            self._metrics['invalidations'] += len(stale)
+
+    def invalidate_balance(self, account_no: int, balance=_UNKNOWN):
+        self.invalidate_account(account_no, {'balance': balance, 'credit_limit': _UNKNOWN})
+
+    @classmethod
+    def _may_match(cls, filters: Dict, changes: Optional[Dict], row_added: bool) -> bool:
+        if changes is None:
+            return True
+        constrained = {cls.FILTER_COLUMNS[name] for name, value in filters.items()
+                       if value not in (None, '')}
+        # An existing row outside the result can only enter it through a
+        # constrained column, and only if its new values satisfy the filter.
+        if not row_added and not constrained & set(changes):
+            return False
+        for name, value in filters.items():
+            if value in (None, ''):
+                continue
+            new = changes.get(cls.FILTER_COLUMNS[name], _UNKNOWN)
+            if new is _UNKNOWN or new is None:
+                continue
+            try:
+                if name == 'account_type' and new != value:
+                    return False
+                if name == 'balance_min' and float(new) < float(value):
+                    return False
+                if name == 'balance_max' and float(new) > float(value):
+                    return False
+                if name == 'date_start' and str(new)[:10] < str(value)[:10]:
+                    return False
+                if name == 'date_end' and str(new)[:10] > str(value)[:10]:
+                    return False
+                if name == 'location' and str(value).lower() not in str(new).lower():
+                    return False
+                if name == 'location_exact' and str(value).strip().lower() != str(new).strip().lower():
+                    return False
+            except (TypeError, ValueError):
+                continue
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._metrics['invalidations'] += len(self._entries)
+            self._generation += 1
+            self._entries.clear()
+            self._rows = 0
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = len(self._entries)
+            metrics['rows'] = self._rows
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_ratio'] = metrics['hits'] / lookups if lookups else 0.0
+        return metrics
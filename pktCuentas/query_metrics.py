@@ -0,0 +1,322 @@
+import bisect
+import functools
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+
+class LatencyHistogram:
+    # Upper bounds in milliseconds; the last bucket takes everything slower.
+    BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self.buckets[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        # Upper bound of the bucket holding the requested rank, capped at
+        # the slowest value seen.
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for position, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                bound = self.BOUNDS_MS[position] if position < len(self.BOUNDS_MS) else self.max_ms
+                return min(float(bound), self.max_ms)
+        return self.max_ms
+
+    def snapshot(self) -> Dict:
+        labels = [f'<={bound}ms' for bound in self.BOUNDS_MS] + [f'>{self.BOUNDS_MS[-1]}ms']
+        return {
+            'count': self.count,
+            'avg_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max_ms,
+            'buckets': {label: count for label, count in zip(labels, self.buckets) if count}
+        }
+
+
+class _Stats:
+    __slots__ = ('histogram', 'rows', 'round_trips', 'slow', 'errors')
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.rows = 0
+        self.round_trips = 0
+        self.slow = 0
+        self.errors = 0
+
+    def snapshot(self) -> Dict:
+        snapshot = self.histogram.snapshot()
+        snapshot.update(rows=self.rows, round_trips=self.round_trips,
+                        slow=self.slow, errors=self.errors)
+        calls = snapshot['count']
+        snapshot['round_trips_per_call'] = self.round_trips / calls if calls else 0.0
+        return snapshot
+
+
+class _TracedCursor:
+    def __init__(self, cursor, metrics: 'QueryMetrics'):
+        self._cursor = cursor
+        self._metrics = metrics
+        self._template = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _run(self, method, query, values):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = method(query, values)
+            failed = False
+            return result
+        finally:
+            self._template = self._metrics.record_query(
+                query, values, (time.perf_counter() - started) * 1000, failed,
+                self._cursor.rowcount if not failed else -1)
+
+    def execute(self, query, values=()):
+        return self._run(self._cursor.execute, query, values)
+
+    def executemany(self, query, rows):
+        rows = list(rows)
+        return self._run(self._cursor.executemany, query, rows)
+
+    def _fetched(self, rows):
+        if self._template is not None and rows:
+            self._metrics.add_rows(self._template, len(rows))
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._fetched([row])
+        return row
+
+    def fetchmany(self, size=1):
+        return self._fetched(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._fetched(self._cursor.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+
+class _TracedConnection:
+    def __init__(self, connection, metrics: 'QueryMetrics'):
+        self._connection = connection
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return _TracedCursor(self._connection.cursor(*args, **kwargs), self._metrics)
+
+    def close(self):
+        self._connection.close()
+
+
+class QueryMetrics:
+    # Collapses the variable-length IN lists built for lookups, so every
+    # chunk size maps to the same template.
+    _IN_LIST = re.compile(r'\bIN\s*\(\s*%s(?:\s*,\s*%s)+\s*\)', re.IGNORECASE)
+    _SPACES = re.compile(r'\s+')
+    MAX_TEMPLATES = 500
+
+    def __init__(self, slow_query_ms: float = 200.0, max_slow_queries: int = 100,
+                 log_slow_queries: bool = True):
+        self.slow_query_ms = slow_query_ms
+        self.log_slow_queries = log_slow_queries
+        self._slow_queries = deque(maxlen=max(1, int(max_slow_queries)))
+        self._templates = {}
+        self._methods = {}
+        self._normalized = {}
+        self._pool_wait = LatencyHistogram()
+        self._started = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def normalize(cls, query: str) -> str:
+        return cls._IN_LIST.sub('IN (%s, ...)', cls._SPACES.sub(' ', query).strip().rstrip('\\').strip())
+
+    def template(self, query: str) -> str:
+        template = self._normalized.get(query)
+        if template is None:
+            if len(self._normalized) >= self.MAX_TEMPLATES * 4:
+                self._normalized.clear()
+            template = self._normalized[query] = self.normalize(query)
+        return template
+
+    @staticmethod
+    def redact(values) -> str:
+        # Only the shape of the parameters is kept; names and amounts never
+        # reach the log.
+        if values is None:
+            return '()'
+        if isinstance(values, list):
+            return f'[{len(values)} filas]'
+        return '(' + ', '.join('NULL' if value is None else f'<{type(value).__name__}>'
+                               for value in values) + ')'
+
+    def _frames(self) -> List:
+        frames = getattr(self._local, 'frames', None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def cursor(self, cursor):
+        return cursor if isinstance(cursor, _TracedCursor) else _TracedCursor(cursor, self)
+
+    def connection(self, connection):
+        return _TracedConnection(connection, self)
+
+    def record_pool_wait(self, seconds: float):
+        with self._lock:
+            self._pool_wait.record(seconds * 1000)
+
+    def record_query(self, query: str, values, ms: float, failed: bool = False,
+                     rowcount: int = -1) -> str:
+        template = self.template(query)
+        frames = self._frames()
+        method = frames[-1][0] if frames else None
+        slow = ms >= self.slow_query_ms
+        # rowcount counts affected rows for writes; rows read back are added
+        # as they are fetched.
+        affected = rowcount if rowcount > 0 and not template.upper().startswith('SELECT') else 0
+        with self._lock:
+            stats = self._templates.get(template)
+            if stats is None and len(self._templates) < self.MAX_TEMPLATES:
+                stats = self._templates[template] = _Stats()
+            if stats is not None:
+                stats.histogram.record(ms)
+                stats.round_trips += 1
+                stats.rows += affected
+                stats.slow += slow
+                stats.errors += failed
+            for frame in frames:
+                frame[1] += 1
+                frame[2] += affected
+            if slow:
+                entry = {
+                    'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'ms': ms,
+                    'method': method,
+                    'query': template,
+                    'params': self.redact(values)
+                }
+                self._slow_queries.append(entry)
+        if slow and self.log_slow_queries:
+            print(f"Consulta lenta ({ms:.1f} ms) en {method or '-'}: {template} {entry['params']}")
+        return template
+
+    def add_rows(self, template: str, rows: int):
+        with self._lock:
+            stats = self._templates.get(template)
+            if stats is not None:
+                stats.rows += rows
+            for frame in self._frames():
+                frame[2] += rows
+
+    def call(self, name: str, function, *args, **kwargs):
+        # Times a whole DatabaseManager call, pool waits included, and
+        # collects the round trips and rows of the queries it runs.
+        frames = self._frames()
+        frame = [name, 0, 0]
+        frames.append(frame)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = function(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            frames.pop()
+            with self._lock:
+                stats = self._methods.get(name)
+                if stats is None:
+                    stats = self._methods[name] = _Stats()
+                stats.histogram.record(ms)
+                stats.round_trips += frame[1]
+                stats.rows += frame[2]
+                stats.slow += ms >= self.slow_query_ms
+                stats.errors += failed
+
+    def reset(self):
+        with self._lock:
+            self._templates.clear()
+            self._methods.clear()
+            self._slow_queries.clear()
+            self._pool_wait = LatencyHistogram()
+            self._started = time.time()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'since': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._started)),
+                'slow_query_ms': self.slow_query_ms,
+                'pool_wait': self._pool_wait.snapshot(),
+                'methods': {name: stats.snapshot() for name, stats in self._methods.items()},
+                'queries': {template: stats.snapshot() for template, stats in self._templates.items()},
+                'slow_queries': list(self._slow_queries)
+            }
+
+    @staticmethod
+    def format_snapshot(snapshot: Dict, top: int = 10) -> str:
+        if not snapshot:
+            return 'Métricas de consultas desactivadas'
+        lines = [f"Métricas desde {snapshot['since']} (umbral lento: {snapshot['slow_query_ms']:.0f} ms)"]
+        wait = snapshot['pool_wait']
+        lines.append(f"Espera de conexión: {wait['count']} solicitudes, prom {wait['avg_ms']:.2f} ms, "
+                     f"p95 {wait['p95_ms']:.1f} ms, máx {wait['max_ms']:.1f} ms")
+        lines.append('')
+        lines.append('Métodos (por tiempo total):')
+        methods = sorted(snapshot['methods'].items(), key=lambda item: -item[1]['avg_ms'] * item[1]['count'])
+        for name, stats in methods[:top]:
+            lines.append(f"  {name}: {stats['count']} llamadas, prom {stats['avg_ms']:.2f} ms, "
+                         f"p95 {stats['p95_ms']:.1f} ms, {stats['round_trips_per_call']:.1f} viajes/llamada, "
+                         f"{stats['rows']} filas")
+        lines.append('')
+        lines.append('Consultas (por tiempo total):')
+        queries = sorted(snapshot['queries'].items(), key=lambda item: -item[1]['avg_ms'] * item[1]['count'])
+        for template, stats in queries[:top]:
+            text = template if len(template) <= 90 else template[:87] + '...'
+            lines.append(f"  {stats['count']}x prom {stats['avg_ms']:.2f} ms, p95 {stats['p95_ms']:.1f} ms, "
+                         f"{stats['rows']} filas: {text}")
+        if snapshot['slow_queries']:
+            lines.append('')
+            lines.append('Consultas lentas recientes:')
+            for entry in snapshot['slow_queries'][-top:]:
+                lines.append(f"  {entry['at']} {entry['ms']:.1f} ms {entry['method'] or '-'}: "
+                             f"{entry['query'][:80]} {entry['params']}")
+        return '\n'.join(lines)
+
+
+def tracked(function):
+    # Marks a DatabaseManager method for per-method metrics; a no-op while
+    # metrics are disabled.
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        metrics = self.query_metrics
+        if metrics is None:
+            return function(self, *args, **kwargs)
+        return metrics.call(function.__name__, function, self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,406 @@
+import bisect
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pktCuentas.database_manager import DatabaseManager
+from pktCuentas.money import from_cents, to_cents
+from pktCuentas.storage_backends import DB_ERRORS
+
+
+class Shard:
+    def __init__(self, name: str, min_account_no: int, max_account_no: Optional[int],
+                 manager: DatabaseManager):
+        self.name = name
+        self.min_account_no = min_account_no
+        self.max_account_no = max_account_no
+        self.manager = manager
+
+    def holds(self, account_no: int) -> bool:
+        return account_no >= self.min_account_no and (self.max_account_no is None
+                                                      or account_no <= self.max_account_no)
+
+
+class ShardedDatabaseManager:
+    # Same interface as DatabaseManager over several databases, each
+    # holding a contiguous account_no range. Single-account operations go to
+    # the owning shard; listings and aggregates run on every shard in
+    # parallel and are merged in account_no (or updated_at) order.
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ShardedDatabaseManager, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        config = DatabaseManager.read_config()
+        names = [name.strip() for name in config.get('sharding', 'shards', fallback='').split(',') if name.strip()]
+        if not names:
+            raise ValueError("No hay shards configurados en [sharding]")
+
+        shards = []
+        for name in names:
+            if not config.has_section(name):
+                raise ValueError(f"No existe la sección del shard: {name}")
+            maximum = config.get(name, 'max_account_no', fallback='').strip()
+            shards.append(Shard(name, config.getint(name, 'min_account_no', fallback=1),
+                                int(maximum) if maximum else None, DatabaseManager(name)))
+        shards.sort(key=lambda shard: shard.min_account_no)
+        for previous, shard in zip(shards, shards[1:]):
+            if previous.max_account_no is None or previous.max_account_no >= shard.min_account_no:
+                raise ValueError(f"Los rangos de los shards {previous.name} y {shard.name} se traslapan")
+
+        self.shards = shards
+        self._mins = [shard.min_account_no for shard in shards]
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.getint('sharding', 'max_workers', fallback=len(shards)),
+            thread_name_prefix='shard')
+
+    @staticmethod
+    def enabled() -> bool:
+        return DatabaseManager.read_config().getboolean('sharding', 'enabled', fallback=False)
+
+    def shard_for(self, account_no: int) -> Optional[Shard]:
+        position = bisect.bisect_right(self._mins, int(account_no)) - 1
+        if position < 0 or not self.shards[position].holds(int(account_no)):
+            return None
+        return self.shards[position]
+
+    @staticmethod
+    def _outside(account_no) -> str:
+        return f"La cuenta {account_no} no pertenece a ningún shard"
+
+    def _fan_out(self, method: str, *args, **kwargs) -> List:
+        futures = [self._executor.submit(getattr(shard.manager, method), *args, **kwargs)
+                   for shard in self.shards]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _merge(results: Iterable[List[Dict]], key: str = 'account_no') -> List[Dict]:
+        # Every shard returns its rows already ordered, so a k-way merge
+        # keeps the global order without sorting again.
+        return list(heapq.merge(*results, key=lambda row: row[key]))
+
+    def _group(self, items: Iterable, account_no_of) -> Tuple[Dict[str, List], List]:
+        groups = {}
+        outside = []
+        for item in items:
+            shard = self.shard_for(account_no_of(item))
+            if shard is None:
+                outside.append(item)
+            else:
+                groups.setdefault(shard.name, []).append(item)
+        return groups, outside
+
+    def _manager(self, name: str) -> DatabaseManager:
+        return next(shard.manager for shard in self.shards if shard.name == name)
+
+    # Connection management
+
+    def connect(self) -> bool:
+        return all(self._fan_out('connect'))
+
+    def disconnect(self):
+        self._fan_out('disconnect')
+
+    def migrate(self, target: int = None) -> Tuple[bool, str]:
+        results = self._fan_out('migrate', target)
+        return (all(success for success, _ in results),
+                '; '.join(f"{shard.name}: {message}" for shard, (_, message) in zip(self.shards, results)))
+
+    def check_query_plans(self) -> List[Dict]:
+        return [dict(plan, shard=shard.name)
+                for shard, plans in zip(self.shards, self._fan_out('check_query_plans')) for plan in plans]
+
+    def enable_cache(self, max_entries: int = 256, ttl: float = 30.0, max_rows: int = 100000):
+        for shard in self.shards:
+            shard.manager.enable_cache(max_entries, ttl, max_rows)
+
+    def disable_cache(self):
+        for shard in self.shards:
+            shard.manager.disable_cache()
+
+    def get_cache_metrics(self) -> Dict:
+        return {shard.name: shard.manager.get_cache_metrics() for shard in self.shards}
+
+    def get_connection_metrics(self) -> Dict:
+        return {shard.name: shard.manager.get_connection_metrics() for shard in self.shards}
+
+    def get_query_metrics(self) -> Dict:
+        # Merged view so QueryMetrics.format_snapshot can print it; the per
+        # shard snapshots stay under 'shards'.
+        snapshots = {shard.name: shard.manager.get_query_metrics() for shard in self.shards}
+        active = [snapshot for snapshot in snapshots.values() if snapshot]
+        if not active:
+            return {}
+        merged = dict(active[0], methods={}, queries={}, slow_queries=[], shards=snapshots)
+        for name, snapshot in snapshots.items():
+            if not snapshot:
+                continue
+            for method, stats in snapshot['methods'].items():
+                merged['methods'][f'{name}.{method}'] = stats
+            for query, stats in snapshot['queries'].items():
+                merged['queries'][f'[{name}] {query}'] = stats
+            merged['slow_queries'].extend(snapshot['slow_queries'])
+        merged['slow_queries'].sort(key=lambda entry: entry['at'])
+        return merged
+
+    def reset_query_metrics(self):
+        for shard in self.shards:
+            shard.manager.reset_query_metrics()
+
+    # Single-account operations
+
+    def insert_account(self, account_no: int, *args, **kwargs) -> Tuple[bool, str]:
+        shard = self.shard_for(account_no)
+        if shard is None:
+            return False, self._outside(account_no)
+        return shard.manager.insert_account(account_no, *args, **kwargs)
+
+    def update_account(self, account_no: int, *args, **kwargs) -> Tuple[bool, str]:
+        shard = self.shard_for(account_no)
+        if shard is None:
+            return False, self._outside(account_no)
+        return shard.manager.update_account(account_no, *args, **kwargs)
+
+    def apply_delta(self, account_no: int, delta: float) -> Tuple[bool, str, Optional[Dict]]:
+        shard = self.shard_for(account_no)
+        if shard is None:
+            return False, self._outside(account_no), None
+        return shard.manager.apply_delta(account_no, delta)
+
+    def delete_account(self, account_no: int) -> Tuple[bool, str]:
+        shard = self.shard_for(account_no)
+        if shard is None:
+            return False, self._outside(account_no)
+        return shard.manager.delete_account(account_no)
+
+    def get_account(self, account_no: int) -> Optional[Dict]:
+        shard = self.shard_for(account_no)
+        return shard.manager.get_account(account_no) if shard is not None else None
+
+    def account_exists(self, account_no: int) -> bool:
+        shard = self.shard_for(account_no)
+        return shard is not None and shard.manager.account_exists(account_no)
+
+    def get_account_statement(self, account_no: int, *args, **kwargs) -> List[Dict]:
+        shard = self.shard_for(account_no)
+        return shard.manager.get_account_statement(account_no, *args, **kwargs) if shard is not None else []
+
+    # Batched writes
+
+    def insert_accounts_bulk(self, rows: List[Dict], chunk_size: int = 1000) -> Tuple[bool, str, Dict]:
+        report = {
+            'inserted': 0,
+            'duplicates': [],
+            'invalid': []
+        }
+        groups = {}
+        for position, row in enumerate(rows):
+            account_no = row.get('account_no')
+            invalid = DatabaseManager._validate_account_no(account_no)
+            shard = self.shard_for(account_no) if invalid is None else None
+            if invalid is None and shard is None:
+                invalid = self._outside(account_no)
+            if invalid:
+                report['invalid'].append((position, account_no, invalid))
+            else:
+                groups.setdefault(shard.name, []).append((position, row))
+
+        futures = {name: self._executor.submit(self._manager(name).insert_accounts_bulk,
+                                               [row for _, row in group], chunk_size)
+                   for name, group in groups.items()}
+        for name, future in futures.items():
+            _, _, shard_report = future.result()
+            positions = [position for position, _ in groups[name]]
+            report['inserted'] += shard_report['inserted']
+            report['duplicates'].extend(shard_report['duplicates'])
+            report['invalid'].extend((positions[position], account_no, message)
+                                     for position, account_no, message in shard_report['invalid'])
+        report['invalid'].sort()
+
+        return (not report['invalid'],
+                f"{report['inserted']} cuentas insertadas, {len(report['duplicates'])} duplicadas, "
+                f"{len(report['invalid'])} inválidas",
+                report)
+
+    def apply_balance_deltas(self, deltas: List[Tuple[int, float, float]],
+                             ledger_entries: List[Tuple] = None,
+                             skip_rejected: bool = False) -> Tuple[bool, str, List[int]]:
+        delta_groups, outside = self._group(deltas, lambda delta: delta[0])
+        ledger_groups, ledger_outside = self._group(ledger_entries or [], lambda entry: entry[0])
+        if outside or ledger_outside:
+            account_no = (outside or ledger_outside)[0][0]
+            return False, self._outside(account_no), []
+
+        # Every shard writes inside its own transaction and nothing is
+        # committed until all of them succeeded, so a failed batch can be
+        # retried as a whole (write-behind does) without applying a shard
+        # twice. Only a failure between the commits themselves can leave
+        # the shards apart.
+        opened = []
+        rejected = []
+        try:
+            for name in sorted(set(delta_groups) | set(ledger_groups)):
+                manager = self._manager(name)
+                connection = manager._get_connection()
+                cursor = connection.cursor()
+                opened.append((manager, connection, cursor))
+                rejected += manager._write_balance_deltas(connection, cursor, delta_groups.get(name, []),
+                                                          ledger_groups.get(name), skip_rejected)
+            if rejected and not skip_rejected:
+                for _, connection, _ in opened:
+                    connection.rollback()
+                return False, DatabaseManager._rejected_deltas_message(rejected), rejected
+            for _, connection, _ in opened:
+                connection.commit()
+            for manager, _, _ in opened:
+                manager._balance_deltas_committed(delta_groups.get(manager.shard, []))
+
+            if rejected:
+                return True, DatabaseManager._rejected_deltas_message(rejected, skipped=True), rejected
+            return True, f"{len(deltas)} cuentas actualizadas exitosamente", []
+
+        except DB_ERRORS as e:
+            for _, connection, _ in opened:
+                connection.rollback()
+            return False, f"Error al actualizar saldos: {str(e)}", []
+
+        finally:
+            for _, connection, cursor in opened:
+                cursor.close()
+                connection.close()
+
+    # Listings
+
+    def get_all_accounts(self) -> List[Dict]:
+        return self._merge(self._fan_out('get_all_accounts'))
+
+    def get_accounts_by_filter(self, account_type: str = None,
+                               balance_min: float = None, balance_max: float = None,
+                               date_start: str = None, date_end: str = None,
+                               location: str = None, location_exact: str = None) -> List[Dict]:
+        return self._merge(self._fan_out('get_accounts_by_filter', account_type, balance_min, balance_max,
+                                         date_start, date_end, location, location_exact))
+
+    def get_accounts_page(self, after_account_no: int = None, limit: int = 1000,
+                          filters: Dict = None) -> List[Dict]:
+        # Shards are walked in range order, so a page only touches the
+        # shards its account numbers can come from.
+        results = []
+        for shard in self.shards:
+            if after_account_no is not None and shard.max_account_no is not None \
+                    and shard.max_account_no <= after_account_no:
+                continue
+            rows = shard.manager.get_accounts_page(after_account_no, limit - len(results), filters)
+            results.extend(rows)
+            if len(results) >= limit:
+                break
+        return results
+
+    def get_accounts_changed_since(self, since) -> List[Dict]:
+        return self._merge(self._fan_out('get_accounts_changed_since', since), key='updated_at')
+
+    def get_last_update(self):
+        updates = [update for update in self._fan_out('get_last_update') if update is not None]
+        return max(updates) if updates else None
+
+    def count_accounts(self) -> int:
+        counts = self._fan_out('count_accounts')
+        return -1 if any(count < 0 for count in counts) else sum(counts)
+
+    def get_account_numbers(self) -> List[int]:
+        return list(heapq.merge(*self._fan_out('get_account_numbers')))
+
+    def existing_account_numbers(self, account_nos: Iterable[int]) -> Set[int]:
+        groups, _ = self._group(account_nos, int)
+        futures = [self._executor.submit(self._manager(name).existing_account_numbers, group)
+                   for name, group in groups.items()]
+        existing = set()
+        for future in futures:
+            existing |= future.result()
+        return existing
+
+    def iter_accounts(self, batch_size: int = 1000, batches: bool = False) -> Iterator:
+        # Ranges do not overlap, so streaming the shards one after another
+        # keeps account_no order and holds a single connection at a time.
+        for shard in self.shards:
+            yield from shard.manager.iter_accounts(batch_size, batches)
+
+    def iter_accounts_by_filter(self, account_type: str = None,
+                                balance_min: float = None, balance_max: float = None,
+                                date_start: str = None, date_end: str = None,
+                                location: str = None, location_exact: str = None,
+                                batch_size: int = 1000, batches: bool = False) -> Iterator:
+        for shard in self.shards:
+            yield from shard.manager.iter_accounts_by_filter(account_type, balance_min, balance_max,
+                                                             date_start, date_end, location, location_exact,
+                                                             batch_size, batches)
+
+    # Aggregates, combined from per-shard partial results
+
+    def get_account_statistics(self, filters: Dict = None) -> Optional[Dict]:
+        parts = self._fan_out('get_account_statistics', filters)
+        if any(part is None for part in parts):
+            return None
+        parts = [part for part in parts if part['total_accounts']]
+        count = sum(part['total_accounts'] for part in parts)
+        balance_cents = sum(to_cents(part['total_balance']) for part in parts)
+        credit_cents = sum(to_cents(part['total_credit']) for part in parts)
+        return {
+            'total_accounts': count,
+            'total_balance': from_cents(balance_cents),
+            'average_balance': from_cents(balance_cents / count) if count else 0.0,
+            'min_balance': min((part['min_balance'] for part in parts), default=0.0),
+            'max_balance': max((part['max_balance'] for part in parts), default=0.0),
+            'normal_accounts': sum(part['normal_accounts'] for part in parts),
+            'credit_accounts': sum(part['credit_accounts'] for part in parts),
+            'total_credit': from_cents(credit_cents),
+            'average_credit': from_cents(credit_cents / count) if count else 0.0
+        }
+
+    def get_type_summary(self, filters: Dict = None) -> Optional[List[Dict]]:
+        parts = self._fan_out('get_type_summary', filters)
+        if any(part is None for part in parts):
+            return None
+        combined = {}
+        for row in (row for part in parts for row in part):
+            current = combined.setdefault(row['account_type'], {
+                'account_type': row['account_type'], 'count': 0, 'cents': 0,
+                'min_balance': row['min_balance'], 'max_balance': row['max_balance']})
+            current['count'] += row['count']
+            current['cents'] += to_cents(row['total_balance'])
+            current['min_balance'] = min(current['min_balance'], row['min_balance'])
+            current['max_balance'] = max(current['max_balance'], row['max_balance'])
+        return [{'account_type': row['account_type'], 'count': row['count'],
+                 'total_balance': from_cents(row['cents']),
+                 'average_balance': from_cents(row['cents'] / row['count']),
+                 'min_balance': row['min_balance'], 'max_balance': row['max_balance']}
+                for _, row in sorted(combined.items())]
+
+    def get_monthly_summary(self, filters: Dict = None) -> Optional[List[Dict]]:
+        parts = self._fan_out('get_monthly_summary', filters)
+        if any(part is None for part in parts):
+            return None
+        combined = {}
+        for row in (row for part in parts for row in part):
+            current = combined.setdefault((row['month'], row['account_type']), [0, 0])
+            current[0] += row['count']
+            current[1] += to_cents(row['total_balance'])
+        return [{'month': month, 'account_type': account_type, 'count': count,
+                 'total_balance': from_cents(cents)}
+                for (month, account_type), (count, cents) in sorted(combined.items())]
+
+
+def open_database_manager():
+    # Entry point for the UI: the sharded manager when [sharding] is
+    # enabled, the single database otherwise.
+    if ShardedDatabaseManager.enabled():
+        return ShardedDatabaseManager()
+    return DatabaseManager()
@@ -0,0 +1,177 @@
+import atexit
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from pktCuentas.money import cents_to_decimal
+
+
+class WriteBehindBuffer:
+    DURABILITY_MODES = ('strict', 'timed', 'relaxed')
+
+    def __init__(self, db_manager, max_pending: int = 500, max_delay: float = 2.0,
+                 durability: str = 'timed', on_rejected: Callable[[List[int]], None] = None):
+        if durability not in self.DURABILITY_MODES:
+            raise ValueError(f"Modo de durabilidad inválido: {durability}")
+        self.db_manager = db_manager
+        # Called, outside the buffer's locks, with the accounts whose delta
+        # the database rejected, so the caller can resync them.
+        self.on_rejected = on_rejected
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self.durability = durability
+        self._pending = {}
+        self._ledger = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._metrics = {
+            'operations': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'rejected_accounts': 0,
+            'rows_flushed': 0,
+            'operations_flushed': 0,
+            'ledger_rows_flushed': 0,
+            'last_flush_seconds': 0.0,
+            'total_flush_seconds': 0.0
+        }
+        self._timer = None
+        if durability == 'timed':
+            self._timer = threading.Thread(target=self._run_timer, name='write-behind-flush', daemon=True)
+            self._timer.start()
+        atexit.register(self.close)
+
+    def record(self, account_no: int, balance_delta: int, credit_delta: int = 0,
+               ledger_entry: Tuple = None):
+        # Deltas are integer cents, so coalescing many operations is exact.
+        if self.durability == 'strict':
+            return self._write_through(account_no, balance_delta, credit_delta, ledger_entry)
+        with self._lock:
+            if ledger_entry is not None:
+                self._ledger.append(ledger_entry)
+            entry = self._pending.get(account_no)
+            if entry is None:
+                self._pending[account_no] = [balance_delta, credit_delta, 1]
+            else:
+                entry[0] += balance_delta
+                entry[1] += credit_delta
+                entry[2] += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._metrics['operations'] += 1
+            due = (len(self._pending) >= self.max_pending
+                   or time.monotonic() - self._oldest >= self.max_delay)
+        if due:
+            return self.flush()
+        return True, "Operación en espera de escritura"
+
+    def _write_through(self, account_no: int, balance_delta: int, credit_delta: int,
+                       ledger_entry: Tuple) -> Tuple[bool, str]:
+        # Strict mode writes each operation on its own and never re-queues
+        # it: on failure the caller gets the error and undoes the change.
+        deltas = [(account_no, cents_to_decimal(balance_delta), cents_to_decimal(credit_delta))]
+        ledger = [ledger_entry] if ledger_entry is not None else []
+        with self._flush_lock:
+            started = time.perf_counter()
+            success, message, _ = self.db_manager.apply_balance_deltas(deltas, ledger)
+            elapsed = time.perf_counter() - started
+        with self._lock:
+            self._metrics['operations'] += 1
+            if not success:
+                self._metrics['failed_flushes'] += 1
+                return False, message
+            self._metrics['flushes'] += 1
+            self._metrics['rows_flushed'] += 1
+            self._metrics['operations_flushed'] += 1
+            self._metrics['ledger_rows_flushed'] += len(ledger)
+            self._metrics['last_flush_seconds'] = elapsed
+            self._metrics['total_flush_seconds'] += elapsed
+        return True, "1 cuentas sincronizadas"
+
+    def flush(self) -> Tuple[bool, str]:
+        success, message, rejected = self._flush()
+        if rejected and self.on_rejected is not None:
+            self.on_rejected(rejected)
+        return success, message
+
+    def _flush(self) -> Tuple[bool, str, List[int]]:
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending and not self._ledger:
+                    return True, "No hay cambios pendientes", []
+                pending, self._pending = self._pending, {}
+                ledger, self._ledger = self._ledger, []
+                self._oldest = None
+
+            deltas = [(account_no, cents_to_decimal(entry[0]), cents_to_decimal(entry[1]))
+                      for account_no, entry in pending.items() if entry[0] or entry[1]]
+            started = time.perf_counter()
+            if deltas or ledger:
+                # A rejected row (its account deleted or changed behind our
+                # back) is set aside; retrying it would fail every flush.
+                success, message, rejected = self.db_manager.apply_balance_deltas(deltas, ledger,
+                                                                                  skip_rejected=True)
+            else:
+                success, message, rejected = True, '', []
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                if not success:
+                    # Put the changes back so the next flush retries them.
+                    for account_no, entry in pending.items():
+                        current = self._pending.setdefault(account_no, [0, 0, 0])
+                        current[0] += entry[0]
+                        current[1] += entry[1]
+                        current[2] += entry[2]
+                    self._ledger[:0] = ledger
+                    if self._oldest is None:
+                        self._oldest = time.monotonic()
+                    self._metrics['failed_flushes'] += 1
+                    return False, message, []
+                rejected = set(rejected)
+                written = [entry for account_no, entry in pending.items() if account_no not in rejected]
+                self._metrics['flushes'] += 1
+                self._metrics['rejected_accounts'] += len(rejected)
+                self._metrics['rows_flushed'] += len(deltas) - len(rejected)
+                self._metrics['operations_flushed'] += sum(entry[2] for entry in written)
+                self._metrics['ledger_rows_flushed'] += sum(1 for entry in ledger
+                                                            if int(entry[0]) not in rejected)
+                self._metrics['last_flush_seconds'] = elapsed
+                self._metrics['total_flush_seconds'] += elapsed
+            if rejected:
+                return False, message, sorted(rejected)
+            return True, f"{len(deltas)} cuentas sincronizadas", []
+
+    def has_pending(self, account_no: int) -> bool:
+        with self._lock:
+            return int(account_no) in self._pending
+
+    def _run_timer(self):
+        while not self._stop.wait(self.max_delay):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+            if due:
+                self.flush()
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['pending_accounts'] = len(self._pending)
+            metrics['pending_operations'] = sum(entry[2] for entry in self._pending.values())
+        flushed = metrics['operations_flushed']
+        metrics['coalescing_ratio'] = flushed / metrics['rows_flushed'] if metrics['rows_flushed'] else 0.0
+        return metrics
+
+    def close(self):
+        atexit.unregister(self.close)
+        self._stop.set()
+        if self._timer is not None and self._timer is not threading.current_thread():
+            self._timer.join(timeout=self.max_delay)
+        return self.flush()
@@ -11,10 +11,11 @@ from PyQt5.uic import loadUi
 
 from pktCuentas.bank_herencia import BankManager
 from pktCuentas.credit_account import CreditAccount
-from pktCuentas.database_manager import DatabaseManager
+from pktCuentas.sharding import open_database_manager
 from pktCuentas.data_manager import DataManager
 from pktCuentas.analytics import Analytics
 from pktCuentas.charts import ChartGenerator
+from pktCuentas.query_metrics import QueryMetrics
 from pktCuentasUI.add_account_dialog import AddAccountDialog
 from pktCuentasUI.filter_dialogs import BalanceFilterDialog, AccountTypeFilterDialog, PlaceFilterDialog
 from pktCuentasUI.results_dialogs import ChartDialog, FilterResultDialog, ImportResultDialog
@@ -29,7 +30,7 @@ class Main(QMainWindow):
             # Load UI file from the same directory as this script
             ui_path = os.path.join(os.path.dirname(__file__), 'mwVentana.ui')
             loadUi(ui_path, self)
-            self.db_manager = DatabaseManager()
+            self.db_manager = open_database_manager()
             connected = self.db_manager.connect()
             if not connected:
                 QMessageBox.warning(self, 'Advertencia Base de Datos',
@@ -346,6 +347,7 @@ class Main(QMainWindow):
         try:
             result = QMessageBox.question(self, 'Salir', '¿Está seguro de salir?', QMessageBox.Yes | QMessageBox.No)
             if result == QMessageBox.Yes:
+                self.bank.close()
                 QApplication.quit()
         except Exception as e:
             QMessageBox.critical(self, 'Error', str(e))
@@ -417,9 +419,8 @@ class Main(QMainWindow):
             dlg = BalanceFilterDialog(self)
             if dlg.exec_() == QDialog.Accepted:
                 params = dlg.get_filter_params()
-                accounts = self.bank.handle_list_accounts()
-                df = Analytics.accounts_to_dataframe(accounts)
-                filtered_df = Analytics.filter_by_balance_range(df, params['balance_min'], params['balance_max'])
+                accounts = self.bank.find_by_balance_range(params['balance_min'], params['balance_max'])
+                filtered_df = Analytics.accounts_to_dataframe(accounts)
                 result_dlg = FilterResultDialog(filtered_df, 'Filtro por Saldo', self)
                 result_dlg.exec_()
         except Exception as e:
@@ -430,9 +431,8 @@ class Main(QMainWindow):
             dlg = AccountTypeFilterDialog(self)
             if dlg.exec_() == QDialog.Accepted:
                 params = dlg.get_filter_params()
-                accounts = self.bank.handle_list_accounts()
-                df = Analytics.accounts_to_dataframe(accounts)
-                filtered_df = Analytics.filter_by_account_type(df, params['tipo'])
+                accounts = self.bank.find_by_account_type(params['tipo'])
+                filtered_df = Analytics.accounts_to_dataframe(accounts)
                 result_dlg = FilterResultDialog(filtered_df, f'Filtro por Tipo: {params["tipo"]}', self)
                 result_dlg.exec_()
         except Exception as e:
@@ -440,15 +440,14 @@ class Main(QMainWindow):
 
     def show_date_place_filter(self):
         try:
-            accounts = self.bank.handle_list_accounts()
+            accounts = self.bank.store
             df = Analytics.accounts_to_dataframe(accounts)
             loc_options = Analytics.get_location_options(df)
             dlg = PlaceFilterDialog(self, locations=loc_options)
             if dlg.exec_() == QDialog.Accepted:
                 params = dlg.get_filter_params()
-                accounts = self.bank.handle_list_accounts()
-                df = Analytics.accounts_to_dataframe(accounts)
-                filtered_df = Analytics.filter_by_location(df, location=params['lugar'])
+                accounts = self.bank.find_by_location(params['lugar'])
+                filtered_df = Analytics.accounts_to_dataframe(accounts)
                 result_dlg = FilterResultDialog(filtered_df, 'Filtro por Lugar', self)
                 result_dlg.exec_()
         except Exception as e:
@@ -456,7 +455,7 @@ class Main(QMainWindow):
 
     def show_chart_balance(self):
         try:
-            accounts = self.bank.handle_list_accounts()
+            accounts = self.bank.store
             chart_gen = ChartGenerator()
             fig = chart_gen.generate_balance_histogram(accounts)
             if fig is not None:
@@ -467,9 +466,9 @@ class Main(QMainWindow):
 
     def show_chart_types(self):
         try:
-            accounts = self.bank.handle_list_accounts()
+            accounts = self.bank.store
             chart_gen = ChartGenerator()
-            fig = chart_gen.generate_account_type_pie(accounts)
+            fig = chart_gen.generate_account_type_pie(accounts, self.bank.reporting_db_manager())
             if fig is not None:
                 dlg = ChartDialog(fig, 'Tipos de Cuenta', self)
                 dlg.exec_()
@@ -478,9 +477,9 @@ class Main(QMainWindow):
 
     def show_chart_temporal(self):
         try:
-            accounts = self.bank.handle_list_accounts()
+            accounts = self.bank.store
             chart_gen = ChartGenerator()
-            fig = chart_gen.generate_temporal_trend(accounts)
+            fig = chart_gen.generate_temporal_trend(accounts, self.bank.reporting_db_manager())
             if fig is not None:
                 dlg = ChartDialog(fig, 'Análisis Temporal', self)
                 dlg.exec_()
@@ -489,7 +488,7 @@ class Main(QMainWindow):
 
     def show_chart_credit(self):
         try:
-            accounts = self.bank.handle_list_accounts()
+            accounts = self.bank.store
             chart_gen = ChartGenerator()
             fig = chart_gen.generate_credit_comparison(accounts)
             if fig is not None:
@@ -503,23 +502,29 @@ class Main(QMainWindow):
             dlg = ReportDialog(self)
             if dlg.exec_() == QDialog.Accepted:
                 selected = dlg.get_selected_report()
-                accounts = self.bank.handle_list_accounts()
+                accounts = self.bank.store
                 if selected == 'hist':
                     fig = ChartGenerator().generate_balance_histogram(accounts)
                     if fig is not None:
                         ChartDialog(fig, 'Distribución de Saldos', self).exec_()
                 elif selected == 'pie':
-                    fig = ChartGenerator().generate_account_type_pie(accounts)
+                    fig = ChartGenerator().generate_account_type_pie(accounts, self.bank.reporting_db_manager())
                     if fig is not None:
                         ChartDialog(fig, 'Distribución por Tipo', self).exec_()
                 elif selected == 'time':
-                    fig = ChartGenerator().generate_temporal_trend(accounts)
+                    fig = ChartGenerator().generate_temporal_trend(accounts, self.bank.reporting_db_manager())
                     if fig is not None:
                         ChartDialog(fig, 'Tendencia Temporal', self).exec_()
                 elif selected == 'credit':
                     fig = ChartGenerator().generate_credit_comparison(accounts)
                     if fig is not None:
                         ChartDialog(fig, 'Comparación Crédito', self).exec_()
+                elif selected == 'metrics':
+                    if self.db_manager is None:
+                        QMessageBox.information(self, 'Rendimiento', 'No hay conexión a la base de datos.')
+                    else:
+                        QMessageBox.information(self, 'Rendimiento de la base de datos',
+                                                QueryMetrics.format_snapshot(self.db_manager.get_query_metrics()))
         except Exception as e:
             QMessageBox.critical(self, 'Error', str(e))
 
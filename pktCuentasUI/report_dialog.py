@@ -22,10 +22,12 @@ class ReportDialog(QDialog):
         self.radio_pie = QRadioButton('Distribución por tipo de cuenta')
         self.radio_time = QRadioButton('Tendencia temporal de apertura de cuentas')
         self.radio_credit = QRadioButton('Comparación balance vs límite de crédito (solo crédito)')
+        self.radio_metrics = QRadioButton('Rendimiento de la base de datos')
         group_layout.addWidget(self.radio_hist)
         group_layout.addWidget(self.radio_pie)
         group_layout.addWidget(self.radio_time)
         group_layout.addWidget(self.radio_credit)
+        group_layout.addWidget(self.radio_metrics)
         group.setLayout(group_layout)
         layout.addWidget(group)
 
@@ -52,4 +54,6 @@ class ReportDialog(QDialog):
             return 'time'
         elif self.radio_credit.isChecked():
             return 'credit'
+        elif self.radio_metrics.isChecked():
+            return 'metrics'
         return None
@@ -0,0 +1,38 @@
+import pytest
+
+from pktCuentas.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def database_path(tmp_path, monkeypatch):
+    # Points DatabaseManager at a temporary SQLite file; the singleton and
+    # its config path are restored after the test.
+    config = tmp_path / 'database_config.ini'
+    config.write_text(f"""[database]
+backend = sqlite
+auto_migrate = true
+
+[sqlite]
+path = {tmp_path / 'banco.db'}
+pool_size = 2
+pool_max_size = 4
+pool_timeout = 2
+cache_size_kb = 1024
+mmap_size_mb = 16
+busy_timeout_ms = 2000
+
+[metrics]
+log_slow_queries = false
+""", encoding='utf-8')
+    monkeypatch.setattr(DatabaseManager, 'CONFIG_PATH', str(config))
+    monkeypatch.setattr(DatabaseManager, '_instance', None)
+    monkeypatch.setattr(DatabaseManager, '_shards', {})
+    return tmp_path / 'banco.db'
+
+
+@pytest.fixture
+def database(database_path):
+    manager = DatabaseManager()
+    assert manager.connect()
+    yield manager
+    manager.disconnect()
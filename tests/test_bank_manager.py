@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+from pktCuentas.account_store import AccountStore, ColumnarAccountStore
+from pktCuentas.bank_herencia import BankManager
+
+
+@pytest.mark.parametrize('store_class', [AccountStore, ColumnarAccountStore])
+def test_failed_full_reload_keeps_the_loaded_accounts(database, monkeypatch, store_class):
+    bank = BankManager(database, store=store_class())
+    for account_no in (1, 2, 3):
+        bank.add_account(account_no, 'a', 'b', 'c', 'normal', 100.0, '2024-01-01', 'x')
+    watermark = bank._watermark
+    streamed = database.iter_accounts
+
+    def broken_stream(*args, **kwargs):
+        rows = streamed(*args, **kwargs)
+        yield next(rows)
+        rows.close()
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(database, 'iter_accounts', broken_stream)
+    error = bank.reload_from_database()
+
+    assert isinstance(error, sqlite3.OperationalError)
+    assert sorted(acc.get_account_number() for acc in bank.list_accounts()) == [1, 2, 3]
+    assert len(bank.find_by_balance_range(0, 1000)) == 3
+    assert bank._watermark == watermark
+
+    monkeypatch.setattr(database, 'iter_accounts', streamed)
+    assert bank.reload_from_database() is None
+    assert len(bank.list_accounts()) == 3
+
+
+def test_stream_errors_reach_the_consumer(database):
+    with pytest.raises(sqlite3.OperationalError):
+        list(database._iter_query("SELECT * FROM missing_table"))
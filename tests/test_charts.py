@@ -0,0 +1,35 @@
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import pytest
+
+from pktCuentas.account import Account
+from pktCuentas.charts import ChartGenerator
+from pktCuentas.credit_account import CreditAccount
+
+
+def _accounts(normal, credit):
+    accounts = [Account(n, 'Pérez', 'López', 'Ana', balance=100.0) for n in range(1, normal + 1)]
+    accounts += [CreditAccount(n, 'Gómez', 'Ruiz', 'Luis', balance=500.0)
+                 for n in range(normal + 1, normal + credit + 1)]
+    return accounts
+
+
+@pytest.mark.parametrize('normal,credit,expected,names', [
+    (3, 1, ['Cuenta Normal', 'Cuenta de Crédito'], ['Normal', 'Crédito']),
+    (1, 3, ['Cuenta de Crédito', 'Cuenta Normal'], ['Crédito', 'Normal']),
+    (0, 2, ['Cuenta de Crédito'], ['Crédito']),
+    (2, 0, ['Cuenta Normal'], ['Normal']),
+])
+def test_type_pie_labels_follow_the_summary(normal, credit, expected, names):
+    fig = ChartGenerator.generate_account_type_pie(_accounts(normal, credit))
+    try:
+        ax_counts, ax_balances = fig.axes
+        assert [text.get_text() for text in ax_counts.texts if text.get_text().startswith('Cuenta')] == expected
+        assert all(label in [text.get_text() for text in ax_balances.texts] for label in expected)
+        legend = [text.get_text() for text in ax_counts.get_legend().get_texts()]
+        assert [entry.split(':')[0] for entry in legend] == names
+    finally:
+        plt.close(fig)
@@ -0,0 +1,98 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pktCuentas.account_store import AccountStore, ColumnarAccountStore
+from pktCuentas.bank_herencia import BankManager
+from pktCuentas.credit_account import CreditAccount
+from pktCuentas.money import to_cents
+
+THREADS = 16
+OPERATIONS_PER_THREAD = 500
+ACCOUNTS = 20
+
+
+class RecordingDatabase:
+    # Stands in for DatabaseManager: keeps the sum of every delta written,
+    # which is what the accounts table would hold.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.balances = {}
+        self.credits = {}
+
+    def apply_balance_deltas(self, deltas, ledger=None, skip_rejected=False):
+        with self.lock:
+            for account_no, balance_delta, credit_delta in deltas:
+                self.balances[account_no] = self.balances.get(account_no, 0) + to_cents(balance_delta)
+                self.credits[account_no] = self.credits.get(account_no, 0) + to_cents(credit_delta)
+        return True, 'ok', []
+
+
+def _bank(store, write_behind):
+    bank = BankManager(store=store)
+    for account_no in range(ACCOUNTS):
+        if account_no % 2:
+            bank.add_account(account_no, 'a', 'b', 'c', 'credit', 100.0, '2024-01-01', 'x', 300.0)
+        else:
+            bank.add_account(account_no, 'a', 'b', 'c', 'normal', 100.0, '2024-01-01', 'x')
+    database = None
+    if write_behind:
+        database = RecordingDatabase()
+        bank.db_manager = database
+        bank.enable_write_behind(max_pending=5, max_delay=0.01, durability=write_behind)
+    return bank, database
+
+
+def _credit(acc):
+    return acc.get_credit_limit_cents() if isinstance(acc, CreditAccount) else 0
+
+
+def _funds(bank):
+    # Balance plus remaining credit, in cents, per account.
+    return {acc.get_account_number(): acc.get_balance_cents() + _credit(acc)
+            for acc in bank.list_accounts()}
+
+
+@pytest.mark.parametrize('store_class', [AccountStore, ColumnarAccountStore])
+@pytest.mark.parametrize('write_behind', [None, 'relaxed', 'timed', 'strict'])
+def test_concurrent_deposits_and_withdrawals_lose_no_updates(store_class, write_behind):
+    bank, database = _bank(store_class(), write_behind)
+    start = _funds(bank)
+
+    def run(seed):
+        rng = random.Random(seed)
+        applied = {}
+        for _ in range(OPERATIONS_PER_THREAD):
+            account_no = rng.randrange(ACCOUNTS)
+            cents = rng.randrange(1, 5000)
+            if rng.random() < 0.5:
+                result = bank.deposit_to_account(account_no, cents / 100)
+                delta = cents
+            else:
+                result = bank.withdraw_from_account(account_no, cents / 100)
+                delta = -cents
+            if not isinstance(result, Exception):
+                applied[account_no] = applied.get(account_no, 0) + delta
+        return applied
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        results = list(executor.map(run, range(THREADS)))
+
+    expected = dict(start)
+    for applied in results:
+        for account_no, delta in applied.items():
+            expected[account_no] += delta
+    final = _funds(bank)
+    assert final == expected
+    assert all(acc.get_balance_cents() >= 0 for acc in bank.list_accounts())
+
+    if database is not None:
+        assert bank.close()[0]
+        for acc in bank.list_accounts():
+            account_no = acc.get_account_number()
+            start_balance = to_cents(100.0)
+            start_credit = to_cents(300.0) if account_no % 2 else 0
+            assert start_balance + database.balances.get(account_no, 0) == acc.get_balance_cents()
+            assert start_credit + database.credits.get(account_no, 0) == _credit(acc)
@@ -0,0 +1,20 @@
+from pktCuentas.bank_herencia import BankManager
+from pktCuentas.data_manager import DataManager
+
+
+def test_import_keeps_dates_with_mixed_timezones(tmp_path):
+    path = tmp_path / 'cuentas.csv'
+    path.write_text(
+        "account_no,last_name,middle_name,first_name,balance,date\n"
+        "1,Perez,Lopez,Ana,100.00,2024-01-05T00:00:00Z\n"
+        "2,Ruiz,Soto,Luis,200.00,2024-01-07\n"
+        "3,Diaz,Mora,Eva,300.00,2024-01-05T23:00:00-06:00\n"
+        "4,Vega,Cruz,Sara,400.00,no es fecha\n", encoding='utf-8')
+    bank = BankManager()
+
+    result = DataManager.import_from_csv(str(path), None, bank)
+
+    assert result['success'] == 3
+    assert result['errors'] == ["Row 5: Invalid date format 'no es fecha'"]
+    # The date as written, as the per-row parse kept it.
+    assert [bank.get_account(n).get_date() for n in (1, 2, 3)] == ['2024-01-05', '2024-01-07', '2024-01-05']
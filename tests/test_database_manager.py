@@ -0,0 +1,89 @@
+import datetime
+
+from pktCuentas.ledger import LedgerWriter
+
+
+def _row(account_no, **fields):
+    row = {'account_no': account_no, 'last_name': 'a', 'middle_name': 'b', 'first_name': 'c',
+           'balance': 100.0, 'date': '2024-01-01', 'location': 'x'}
+    row.update(fields)
+    return row
+
+
+def test_insert_accounts_bulk_reports_invalid_account_numbers(database):
+    rows = [_row(1), _row(-5), _row(0), _row('abc'), _row(None), _row(2.5), _row(True), _row(2)]
+
+    success, _, report = database.insert_accounts_bulk(rows)
+
+    assert not success
+    assert report['inserted'] == 2
+    assert [(position, account_no) for position, account_no, _ in report['invalid']] == [
+        (1, -5), (2, 0), (3, 'abc'), (4, None), (5, 2.5), (6, True)]
+    assert report['invalid'][1][2] == "El número de cuenta debe ser positivo"
+    assert report['invalid'][2][2] == "Número de cuenta inválido: abc"
+    assert database.get_account_numbers() == [1, 2]
+
+
+def test_insert_account_and_duplicate(database):
+    assert database.insert_account(1, 'a', 'b', 'c', 100.0, '2024-01-02', 'x') == (
+        True, 'Cuenta 1 insertada exitosamente')
+    assert database.insert_account(1, 'a', 'b', 'c') == (False, 'La cuenta 1 ya existe')
+    account = database.get_account(1)
+    assert account['balance'] == 100.0
+    assert account['date'] == datetime.date(2024, 1, 2)
+
+
+def test_update_and_delete_missing_account(database):
+    assert database.update_account(9, last_name='z') == (False, 'La cuenta 9 no existe')
+    assert database.delete_account(9) == (False, 'La cuenta 9 no existe')
+    database.insert_account(1, 'a', 'b', 'c')
+    assert database.update_account(1, last_name='z')[0]
+    assert database.get_account(1)['last_name'] == 'z'
+    assert database.delete_account(1)[0]
+    assert database.get_account(1) is None
+
+
+def test_apply_delta_is_guarded(database):
+    database.insert_account(1, 'a', 'b', 'c', 100.0)
+    database.insert_account(2, 'a', 'b', 'c', 100.0, account_type='credit', credit_limit=200.0)
+
+    assert database.apply_delta(1, -150) == (False, 'Insufficient funds', None)
+    assert database.apply_delta(2, -400) == (False, 'Saldo y crédito insuficiente', None)
+    assert database.apply_delta(9, 10) == (False, 'La cuenta 9 no existe', None)
+    success, _, row = database.apply_delta(2, -250)
+    assert success and row == {'balance': 0.0, 'credit_limit': 50.0}
+    assert database.get_account(1)['balance'] == 100.0
+    assert [entry['amount'] for entry in database.get_account_statement(2)] == [250.0]
+
+
+def test_apply_balance_deltas_rolls_back_the_whole_batch(database):
+    database.insert_account(1, 'a', 'b', 'c', 100.0)
+    database.insert_account(2, 'a', 'b', 'c', 100.0)
+    ledger = [LedgerWriter.entry(2, LedgerWriter.TX_DEPOSIT, 5, 105, 0)]
+
+    success, message, rejected = database.apply_balance_deltas([(2, 5, 0), (1, -200, 0), (9, 1, 0)], ledger)
+
+    assert not success and rejected == [1, 9]
+    assert message.endswith('en las cuentas 1, 9')
+    assert database.get_account(2)['balance'] == 100.0
+    assert database.get_account_statement(2) == []
+
+    success, _, rejected = database.apply_balance_deltas([(2, 5, 0), (1, -200, 0)], ledger, skip_rejected=True)
+    assert success and rejected == [1]
+    assert database.get_account(1)['balance'] == 100.0
+    assert database.get_account(2)['balance'] == 105.0
+    assert len(database.get_account_statement(2)) == 1
+
+
+def test_insert_accounts_bulk_reports_duplicates(database):
+    database.insert_account(3, 'a', 'b', 'c')
+    rows = [_row(1), _row(2, balance=-1), _row(1), _row(3), _row(4, account_type='credit', credit_limit=50.0)]
+
+    success, message, report = database.insert_accounts_bulk(rows, chunk_size=1)
+
+    assert not success
+    assert message == '2 cuentas insertadas, 2 duplicadas, 1 inválidas'
+    assert sorted(report['duplicates']) == [1, 3]
+    assert report['invalid'] == [(1, 2, 'El balance no puede ser negativo')]
+    assert database.get_account(4)['credit_limit'] == 50.0
+    assert database.existing_account_numbers([1, 2, 3, 4, 5]) == {1, 3, 4}
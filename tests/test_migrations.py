@@ -0,0 +1,65 @@
+import sqlite3
+
+from pktCuentas.database_manager import DatabaseManager
+from pktCuentas.migrations import MigrationRunner
+
+# accounts as it was before the migrations existed, with its single column
+# indexes and no transactions table.
+LEGACY_SCHEMA = """
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_no INTEGER NOT NULL UNIQUE,
+    last_name TEXT NOT NULL,
+    middle_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    balance REAL NOT NULL DEFAULT 0.00,
+    date DATE,
+    location TEXT,
+    account_type TEXT NOT NULL DEFAULT 'normal' CHECK (account_type IN ('normal', 'credit')),
+    credit_limit REAL NOT NULL DEFAULT 0.00,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_account_no ON accounts (account_no);
+CREATE INDEX idx_account_type ON accounts (account_type);
+CREATE INDEX idx_date ON accounts (date);
+INSERT INTO accounts (account_no, last_name, middle_name, first_name, balance, location)
+VALUES (1, 'a', 'b', 'c', 5, ' Leon ');
+"""
+
+
+def _indexes(path, table):
+    connection = sqlite3.connect(path)
+    try:
+        return {row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))}
+    finally:
+        connection.close()
+
+
+def _assert_every_query_uses_an_index(database):
+    plans = database.check_query_plans()
+    assert len(plans) == len(MigrationRunner(database)._plan_checks())
+    assert [plan for plan in plans if not plan['uses_index']] == []
+
+
+def test_migrations_upgrade_a_legacy_database(database_path):
+    connection = sqlite3.connect(database_path)
+    connection.executescript(LEGACY_SCHEMA)
+    connection.close()
+
+    database = DatabaseManager()
+    assert database.connect()
+    try:
+        assert database.migrate() == (True, f'Esquema actualizado (versión {len(MigrationRunner.MIGRATIONS)})')
+        assert _indexes(database_path, 'accounts') == {
+            'idx_type_balance', 'idx_balance', 'idx_date_account', 'idx_updated_at', 'idx_location_norm'}
+        assert _indexes(database_path, 'transactions') == {'idx_tx_account_created', 'idx_tx_created'}
+        assert database.get_accounts_by_filter(location_exact='LEON')[0]['account_no'] == 1
+        _assert_every_query_uses_an_index(database)
+    finally:
+        database.disconnect()
+
+
+def test_every_checked_query_uses_an_index(database):
+    _assert_every_query_uses_an_index(database)
@@ -0,0 +1,103 @@
+import datetime
+import decimal
+import sqlite3
+
+import pytest
+
+from pktCuentas.storage_backends import MySQLBackend, SQLiteBackend, _SQLiteCursor
+
+
+@pytest.mark.parametrize('query, translated', [
+    ("SELECT * FROM accounts WHERE account_no = %s", "SELECT * FROM accounts WHERE account_no = ?"),
+    ("SET balance = GREATEST(balance - %s, 0)", "SET balance = MAX(balance - ?, 0)"),
+    ("DROP TEMPORARY TABLE IF EXISTS t", "DROP TABLE IF EXISTS t"),
+    ("CREATE TEMPORARY TABLE t (a INT) ENGINE=MEMORY", "CREATE TEMPORARY TABLE t (a INT)"),
+    ("SUM(CAST(ROUND(balance * 100) AS SIGNED))", "SUM(CAST(ROUND(balance * 100) AS INTEGER))")
+])
+def test_mysql_constructs_are_rewritten(query, translated):
+    assert _SQLiteCursor.translate(query) == translated
+
+
+def test_translations_are_cached_with_a_bound():
+    _SQLiteCursor.translate("SELECT %s")
+    info = _SQLiteCursor.translate.cache_info()
+    _SQLiteCursor.translate("SELECT %s")
+    assert _SQLiteCursor.translate.cache_info().hits == info.hits + 1
+    assert info.maxsize is not None
+
+
+def test_values_are_converted_per_cursor():
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE t (amount REAL, date DATE, updated_at TIMESTAMP)")
+    cursor = _SQLiteCursor(connection)
+    cursor.executemany("INSERT INTO t VALUES (%s, %s, %s)",
+                       [(decimal.Decimal('1.25'), datetime.date(2024, 1, 2), datetime.datetime(2024, 1, 2, 3, 4, 5))])
+    cursor.execute("SELECT amount, date, updated_at FROM t")
+    assert cursor.fetchall() == [(1.25, datetime.date(2024, 1, 2), datetime.datetime(2024, 1, 2, 3, 4, 5))]
+
+    cursor = _SQLiteCursor(connection, dictionary=True)
+    cursor.execute("SELECT date, MAX(updated_at) FROM t WHERE date = %s", (datetime.date(2024, 1, 2),))
+    assert cursor.fetchone() == {'date': datetime.date(2024, 1, 2), 'MAX(updated_at)': '2024-01-02 03:04:05'}
+
+
+def test_no_process_wide_adapters():
+    # Other sqlite3 users keep the module's defaults.
+    with pytest.raises(sqlite3.ProgrammingError):
+        sqlite3.connect(':memory:').execute("SELECT ?", (decimal.Decimal('1'),))
+    assert (decimal.Decimal, sqlite3.PrepareProtocol) not in sqlite3.adapters
+    assert all(convert.__module__ == 'sqlite3.dbapi2' for convert in sqlite3.converters.values())
+
+
+def test_duplicate_keys_are_recognised(database):
+    database.insert_account(1, 'a', 'b', 'c')
+    connection = database._get_connection()
+    cursor = connection.cursor()
+    try:
+        with pytest.raises(sqlite3.IntegrityError) as error:
+            cursor.execute(database.INSERT_ACCOUNT_QUERY, (1, 'a', 'b', 'c', 1, None, '', 'normal', 0))
+        assert SQLiteBackend.is_duplicate_key(error.value)
+        assert not SQLiteBackend.is_duplicate_key(sqlite3.OperationalError('x'))
+    finally:
+        connection.rollback()
+        cursor.close()
+        connection.close()
+
+
+def test_temporary_lookup_table(database, monkeypatch):
+    for account_no in (1, 2, 3):
+        database.insert_account(account_no, 'a', 'b', 'c')
+    monkeypatch.setattr(database, 'TEMP_TABLE_THRESHOLD', 1)
+    assert database.existing_account_numbers([2, 3, 4]) == {2, 3}
+
+
+def test_pool_returns_connections(database):
+    database.insert_account(1, 'a', 'b', 'c')
+    for _ in range(10):
+        assert database.get_account(1) is not None
+    pool = database.get_connection_metrics()['pool']
+    assert pool['in_use'] == 0
+    assert pool['opened'] <= pool['max_size']
+
+
+class _ExplainCursor:
+    description = [(column,) for column in ('id', 'table', 'type', 'possible_keys', 'key')]
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, values):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.mark.parametrize('row, uses_index', [
+    ((1, 'accounts', 'ALL', 'idx_balance', None), False),
+    ((1, 'accounts', 'ALL', None, None), False),
+    ((1, 'accounts', 'range', 'idx_balance', 'idx_balance'), True),
+    ((1, 'accounts', 'index', None, 'idx_updated_at'), True),
+    ((1, None, None, None, None), True)
+])
+def test_mysql_explain_judges_the_chosen_key(row, uses_index):
+    assert MySQLBackend.explain(_ExplainCursor([row]), "SELECT 1")[0] is uses_index
@@ -0,0 +1,55 @@
+import pytest
+
+from pktCuentas.bank_herencia import BankManager
+
+
+@pytest.fixture
+def bank(database):
+    bank = BankManager(database)
+    bank.add_account(1, 'a', 'b', 'c', 'normal', 100.0, '2024-01-01', 'x')
+    bank.add_account(2, 'a', 'b', 'c', 'normal', 100.0, '2024-01-01', 'x')
+    return bank
+
+
+@pytest.mark.parametrize('durability', ['relaxed', 'timed'])
+def test_removing_an_account_with_a_buffered_delta_keeps_the_others(bank, database, durability):
+    bank.enable_write_behind(max_pending=100, max_delay=60, durability=durability)
+    bank.deposit_to_account(1, 15)
+    bank.deposit_to_account(2, 5)
+
+    assert bank.remove_account(bank.get_account(2)) is True
+    assert database.get_account(2) is None
+
+    bank.deposit_to_account(1, 10)
+    assert bank.close()[0]
+    assert bank.get_account(1).get_balance() == 125.0
+    assert database.get_account(1)['balance'] == 125.0
+
+
+def test_flush_commits_the_rest_and_resyncs_rejected_accounts(bank, database):
+    buffer = bank.enable_write_behind(max_pending=100, max_delay=60, durability='relaxed')
+    bank.deposit_to_account(1, 15)
+    bank.deposit_to_account(2, 5)
+    # The row disappears behind the bank's back.
+    assert database.delete_account(2)[0]
+
+    success, message = bank.flush()
+    assert not success
+    assert '2' in message
+    assert database.get_account(1)['balance'] == 115.0
+    assert bank.get_account(2) is None
+    assert buffer.get_metrics()['rejected_accounts'] == 1
+    assert buffer.pending_count == 0
+    assert bank.close()[0]
+
+
+def test_rejected_delta_resyncs_the_balance_from_the_database(bank, database):
+    bank.enable_write_behind(max_pending=100, max_delay=60, durability='relaxed')
+    bank.withdraw_from_account(1, 80)
+    # Spent elsewhere, so the buffered withdrawal no longer fits.
+    assert database.apply_delta(1, -50)[0]
+
+    assert not bank.flush()[0]
+    assert bank.get_account(1).get_balance() == 50.0
+    assert database.get_account(1)['balance'] == 50.0
+    assert all(entry['amount'] != 80 for entry in database.get_account_statement(1))